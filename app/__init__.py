@@ -5,18 +5,42 @@ from flask_wtf.csrf import CSRFProtect
 db = SQLAlchemy()
 csrf = CSRFProtect()
 
-def create_app():
+def create_app(config=None):
+    """
+    config: dict opsional untuk menimpa nilai config.Config
+            (mis. SQLALCHEMY_DATABASE_URI lain untuk benchmark).
+    """
     app = Flask(__name__)
     app.config.from_object("config.Config")
+    if config:
+        app.config.update(config)
 
+    from .engine import engine_options, install_pragmas
+    engine_options(app)
     db.init_app(app)
     csrf.init_app(app)
+    with app.app_context():
+        install_pragmas(app, db.engine)
+
+    from .jobs import init_jobs
+    init_jobs(app)
+
+    if app.config.get("PROFILING_ENABLED"):
+        from .profiling import init_profiling
+        init_profiling(app)
 
     from .routes import bp
     app.register_blueprint(bp)
 
+    from .api import api
+    app.register_blueprint(api)
+
     with app.app_context():
         from . import models  # noqa
-        db.create_all()
+        from .migrations import ensure_schema
+        ensure_schema(db.engine, always=app.config.get("SCHEMA_CHECK") == "always")
+
+    from .jobs import recover_jobs
+    recover_jobs(app)
 
     return app
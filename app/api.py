@@ -0,0 +1,396 @@
+"""
+api.py - JSON API (v1) untuk layanan lain
+
+Endpoint yang mengubah state hanya menerima body application/json (lihat
+json_request); endpoint GET tidak butuh token CSRF.
+
+Semua respons GET membawa ETag berbasis versi data; klien yang mengirim
+If-None-Match dengan ETag yang sama mendapat 304 tanpa perhitungan ulang.
+
+Format kolumnar untuk ranking (?format=...):
+  - f32   : biner little-endian. Header 16 byte: magic b"SPKR", uint32 versi
+            format, uint32 jumlah baris, uint32 versi data; lalu int32 ids[n],
+            int32 ranks[n], float32 scores[n] (urut peringkat).
+  - arrow : Arrow IPC stream (butuh pyarrow), kolom id, rank, score.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import struct
+from functools import wraps
+
+from flask import Blueprint, jsonify, request, Response, current_app, g, url_for
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import BadRequest
+
+from . import db, csrf
+from .cache import current_data_version
+from .methods import AHP, GroupAHP
+from .group import get_group_aggregate, list_evaluators, matrix_from_pairs, remove_evaluator, run_group_ahp, submit_judgments
+from .jobs import submit_job, job_status, expire_stale_jobs, HANDLERS
+from .models import Criterion, Alternative, AhpResult, Job
+from .similarity import get_similarity_index
+from .snapshots import list_snapshots, load_snapshot, snapshot_rows, diff_snapshots
+from .ranking import RankingUnavailable, get_ranking, get_segmented_ranking, latest_ahp_result, resolve_method, sensitivity_params
+
+api = Blueprint("api", __name__, url_prefix="/api/v1")
+
+F32_MAGIC = b"SPKR"
+F32_FORMAT_VERSION = 1
+
+
+def versioned(view):
+    """ETag = versi data + endpoint + query string; 304 bila If-None-Match cocok."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = g.data_version = current_data_version()
+        digest = hashlib.sha1(f"{request.endpoint}?{request.query_string.decode()}".encode()).hexdigest()[:12]
+        etag = f"v{version}-{digest}"
+        if request.if_none_match.contains(etag):
+            resp = Response(status=304)
+        else:
+            resp = current_app.make_response(view(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "no-cache"
+        return resp
+    return wrapper
+
+
+def _error(message: str, status: int):
+    return jsonify(error=message), status
+
+
+def json_request(view):
+    """
+    Untuk endpoint yang mengubah state: bebas token CSRF, tapi selain GET
+    wajib Content-Type application/json (415 bila bukan). Form atau
+    text/plain lintas situs ditolak; JSON lintas situs butuh preflight CORS
+    yang tidak pernah diizinkan. Body (objek JSON, {} bila kosong) -> g.body.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.body = {}
+        if request.method not in ("GET", "HEAD"):
+            if not request.is_json:
+                return _error("Content-Type harus application/json.", 415)
+            if request.get_data():
+                try:
+                    g.body = request.get_json()
+                except BadRequest:
+                    return _error("Body bukan JSON yang valid.", 400)
+                if not isinstance(g.body, dict):
+                    return _error("Body JSON harus berupa objek.", 400)
+        return view(*args, **kwargs)
+    return csrf.exempt(wrapper)
+
+
+@api.get("/criteria")
+@versioned
+def criteria():
+    items = Criterion.query.order_by(Criterion.id).all()
+    return jsonify(criteria=[
+        {"id": c.id, "name": c.name, "ctype": c.ctype, "unit": c.unit,
+         "source_title": c.source_title, "source_url": c.source_url}
+        for c in items
+    ])
+
+
+@api.get("/alternatives")
+@versioned
+def alternatives():
+    limit = min(max(1, request.args.get("limit", 100, type=int)), current_app.config["MAX_PAGE_SIZE"])
+    offset = max(0, request.args.get("offset", 0, type=int))
+    query = Alternative.query
+    if request.args.get("brand"):
+        query = query.filter(Alternative.brand == request.args["brand"])
+    if request.args.get("sport"):
+        query = query.filter(Alternative.sport == request.args["sport"])
+    total = query.count()
+    rows = db.session.execute(
+        query.with_entities(
+            Alternative.id, Alternative.name, Alternative.brand, Alternative.sport,
+            Alternative.source_title, Alternative.source_url,
+        ).order_by(Alternative.id).offset(offset).limit(limit).statement
+    ).all()
+    return jsonify(total=total, limit=limit, offset=offset, alternatives=[dict(r._mapping) for r in rows])
+
+
+@api.get("/alternatives/<int:aid>/similar")
+@versioned
+def alternative_similar(aid: int):
+    """k alternatif terdekat (?k=..&sport=..&brand=..) menurut matriks ternormalisasi berbobot AHP."""
+    k = min(max(1, request.args.get("k", 10, type=int)), current_app.config["SIMILAR_MAX_K"])
+    try:
+        index = get_similarity_index()
+        neighbors = index.nearest(aid, k, sport=request.args.get("sport") or None, brand=request.args.get("brand") or None)
+    except RankingUnavailable as e:
+        return _error(str(e), 409)
+    except KeyError:
+        return _error(f"Alternatif {aid} tidak ditemukan.", 404)
+    return jsonify(id=aid, k=k, similar=neighbors)
+
+
+@api.get("/weights")
+@versioned
+def weights():
+    last = latest_ahp_result()
+    if not last:
+        return _error("Belum ada hasil AHP.", 404)
+    return jsonify(
+        ahp_result_id=last.id,
+        cr=last.cr,
+        created_at=last.created_at.isoformat() if last.created_at else None,
+        weights={int(k): v for k, v in json.loads(last.weights_json).items()},
+    )
+
+
+@api.get("/weights/<int:rid>")
+@versioned
+def weights_by_id(rid: int):
+    r = db.session.get(AhpResult, rid)
+    if r is None:
+        return _error(f"AhpResult {rid} tidak ditemukan.", 404)
+    return jsonify(
+        ahp_result_id=r.id,
+        cr=r.cr,
+        created_at=r.created_at.isoformat() if r.created_at else None,
+        weights={int(k): v for k, v in json.loads(r.weights_json).items()},
+    )
+
+
+@api.get("/evaluators")
+def evaluators():
+    """Penilai + bobot dan CR individu (tanpa ETag: penilaian tidak menaikkan versi data)."""
+    return jsonify(evaluators=list_evaluators())
+
+
+@api.post("/evaluators/<name>/judgments")
+@json_request
+def evaluator_judgments(name: str):
+    """
+    Simpan / kirim ulang matriks pairwise satu penilai.
+    Body: {"pairwise": {"<ci>_<cj>": nilai, ...} (segitiga atas, ci < cj), "weight": 1.0}
+    """
+    body = g.body
+    try:
+        pairs = {tuple(int(x) for x in key.split("_")): value for key, value in (body.get("pairwise") or {}).items()}
+        crit_ids = [c.id for c in Criterion.query.order_by(Criterion.id).all()]
+        if len(crit_ids) < 2:
+            raise ValueError("Tambahkan minimal 2 kriteria untuk AHP.")
+        weight = body.get("weight")
+        evaluator, priorities, cr = submit_judgments(
+            name, matrix_from_pairs(crit_ids, pairs), crit_ids, None if weight is None else float(weight),
+        )
+    except (ValueError, TypeError) as e:
+        db.session.rollback()
+        return _error(str(e), 400)
+    return jsonify(
+        id=evaluator.id,
+        name=evaluator.name,
+        weight=evaluator.weight,
+        cr=cr,
+        weights=dict(zip(crit_ids, priorities.tolist())),
+    )
+
+
+@api.delete("/evaluators/<int:eid>")
+@json_request
+def evaluator_delete(eid: int):
+    if not remove_evaluator(eid):
+        return _error(f"Penilai {eid} tidak ditemukan.", 404)
+    return "", 204
+
+
+def _group_params(source):
+    mode = source.get("mode", "aij")
+    method = source.get("method") or current_app.config["AHP_WEIGHT_METHOD"]
+    if mode not in GroupAHP.MODES:
+        raise ValueError(f"mode harus salah satu dari {GroupAHP.MODES}.")
+    if method not in AHP.METHODS:
+        raise ValueError(f"method harus salah satu dari {AHP.METHODS}.")
+    max_cr = source.get("max_cr")
+    return mode, method, None if max_cr in (None, "") else float(max_cr)
+
+
+@api.get("/group-ahp")
+def group_ahp_preview():
+    """Bobot kelompok tanpa menyimpan (?mode=aij|aip&method=..&max_cr=..)."""
+    try:
+        mode, method, max_cr = _group_params(request.args)
+        result = get_group_aggregate(method).aggregate(mode, max_cr=max_cr)
+    except ValueError as e:
+        return _error(str(e), 400)
+    return jsonify(
+        mode=mode, method=method, cr=result["cr"], weights=result["weights"],
+        raters=result["raters"], excluded=result["excluded"], matrix=result["matrix"].tolist(),
+    )
+
+
+@api.post("/group-ahp")
+@json_request
+def group_ahp_run():
+    """Agregasikan semua penilai -> AhpResult baru (body JSON: mode, method, max_cr)."""
+    try:
+        result = run_group_ahp(*_group_params(g.body))
+    except ValueError as e:
+        db.session.rollback()
+        return _error(str(e), 400)
+    return jsonify(result), 201
+
+
+def _columnar(ids, ranks, scores, fmt: str):
+    import numpy as np
+    if fmt == "f32":
+        header = struct.pack("<4sIII", F32_MAGIC, F32_FORMAT_VERSION, len(ids), g.data_version)
+        body = header + ids.astype("<i4").tobytes() + ranks.astype("<i4").tobytes() + scores.astype("<f4").tobytes()
+        return Response(body, mimetype="application/octet-stream")
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return _error("Format arrow membutuhkan paket pyarrow; gunakan format=f32.", 406)
+    table = pa.table({
+        "id": pa.array(ids.astype(np.int32)),
+        "rank": pa.array(ranks.astype(np.int32)),
+        "score": pa.array(scores.astype(np.float32)),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(sink.getvalue().to_pybytes(), mimetype="application/vnd.apache.arrow.stream")
+
+
+@api.get("/ranking")
+@versioned
+def ranking():
+    """
+    GET /api/v1/ranking?method=..&top=K&brand=..&sport=..&limit=..&offset=..&format=json|f32|arrow
+    """
+    fmt = request.args.get("format", "json")
+    if fmt not in ("json", "f32", "arrow"):
+        return _error("format harus json, f32 atau arrow.", 400)
+    try:
+        method = resolve_method(request.args.get("method") or None)
+    except ValueError as e:
+        return _error(str(e), 400)
+    try:
+        r = get_ranking(method)
+    except RankingUnavailable as e:
+        return _error(str(e), 409)
+
+    idx = r.select(brand=request.args.get("brand") or None, sport=request.args.get("sport") or None)
+    top = request.args.get("top", 0, type=int)
+    idx = r.top_k(top, idx) if top > 0 else r.sorted(idx)
+
+    if fmt != "json":
+        return _columnar(r.ids[idx], r.rank[idx], r.scores[idx], fmt)
+
+    limit = min(max(1, request.args.get("limit", 100, type=int)), current_app.config["MAX_PAGE_SIZE"])
+    offset = max(0, request.args.get("offset", 0, type=int))
+    return jsonify(
+        method=r.method,
+        ahp_result_id=r.ahp_result_id,
+        cr=r.cr,
+        total=int(len(idx)),
+        limit=limit,
+        offset=offset,
+        weights={c["id"]: float(w) for c, w in zip(r.criteria, r.weights)},
+        ranking=r.rows(idx[offset:offset + limit]),
+    )
+
+
+@api.get("/ranking/segments")
+@versioned
+def ranking_segments():
+    """
+    GET /api/v1/ranking/segments?by=sport|brand&top=K&segment=<label>
+    """
+    try:
+        seg = get_segmented_ranking(request.args.get("by", "sport"))
+    except ValueError as e:
+        return _error(str(e), 400)
+    except RankingUnavailable as e:
+        return _error(str(e), 409)
+    top = max(0, request.args.get("top", 10, type=int))
+    only = request.args.get("segment")
+    return jsonify(
+        by=seg.by,
+        ahp_result_id=seg.ahp_result_id,
+        weights={c["id"]: float(w) for c, w in zip(seg.criteria, seg.weights)},
+        segments=seg.segments(top, only=only),
+    )
+
+
+@api.get("/snapshots")
+def snapshots():
+    """Daftar snapshot ranking terbaru (?method=..&limit=..)."""
+    limit = min(max(1, request.args.get("limit", 50, type=int)), current_app.config["MAX_PAGE_SIZE"])
+    return jsonify(snapshots=list_snapshots(limit=limit, method=request.args.get("method") or None))
+
+
+@api.get("/snapshots/<int:sid>")
+@versioned
+def snapshot_detail(sid: int):
+    """Isi snapshot: ?top=K baris teratas (0 = semua) atau ?format=f32 (biner seperti /ranking)."""
+    import numpy as np
+    loaded = load_snapshot(sid)
+    if loaded is None:
+        return _error(f"Snapshot {sid} tidak ditemukan.", 404)
+    info, snap = loaded
+    if request.args.get("format") == "f32":
+        order = np.argsort(snap.ranks, kind="stable")
+        return _columnar(snap.ids[order], snap.ranks[order], snap.scores[order], "f32")
+    return jsonify(snapshot=info, ranking=snapshot_rows(snap, max(0, request.args.get("top", 100, type=int))))
+
+
+@api.get("/snapshots/diff")
+@versioned
+def snapshot_diff():
+    """GET /api/v1/snapshots/diff?from=<id>&to=<id>&top=K&movers=N"""
+    a_id, b_id = request.args.get("from", type=int), request.args.get("to", type=int)
+    if not a_id or not b_id:
+        return _error("Parameter from dan to (id snapshot) wajib diisi.", 400)
+    a, b = load_snapshot(a_id), load_snapshot(b_id)
+    if a is None or b is None:
+        return _error("Snapshot tidak ditemukan.", 404)
+    result = diff_snapshots(
+        a[1], b[1],
+        top_k=max(1, request.args.get("top", 10, type=int)),
+        movers=max(0, request.args.get("movers", 10, type=int)),
+    )
+    return jsonify({"from": a[0], "to": b[0], **result})
+
+
+@api.post("/jobs/<kind>")
+@json_request
+def job_create(kind: str):
+    """Jadwalkan job (ahp | sensitivity); body JSON = parameter job. Balas 202 + URL status."""
+    if kind not in HANDLERS or kind == "import":
+        return _error(f"Jenis job tidak didukung lewat API: {kind}", 404)
+    params = g.body
+    if kind == "ahp" and params.get("method", "normalization") not in AHP.METHODS:
+        return _error(f"method harus salah satu dari {AHP.METHODS}.", 400)
+    if kind == "sensitivity":
+        try:
+            params = sensitivity_params(MultiDict(params), current_app.config["SENSITIVITY_MAX_SAMPLES"])
+        except ValueError as e:
+            return _error(str(e), 400)
+    job = submit_job(current_app._get_current_object(), kind, params)
+    resp = jsonify(job_status(job))
+    resp.status_code = 202
+    resp.headers["Location"] = url_for("api.job_detail", jid=job.id)
+    return resp
+
+
+@api.get("/jobs/<int:jid>")
+def job_detail(jid: int):
+    job = db.session.get(Job, jid)
+    if job is None:
+        return _error(f"Job {jid} tidak ditemukan.", 404)
+    if job.status in ("queued", "running") and expire_stale_jobs():
+        db.session.refresh(job)
+    return jsonify(job_status(job))
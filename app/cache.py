@@ -0,0 +1,233 @@
+"""
+cache.py - Versi data + cache hasil ranking
+
+Setiap jalur tulis (kriteria, alternatif, nilai, AHP) memanggil
+bump_data_version() sebelum commit. Entri cache hanya valid untuk versi
+data saat dihitung, sehingga perubahan data otomatis meng-invalidasi cache
+di semua worker (versi disimpan di tabel data_version).
+
+Baris kedua tabel data_version (MATRIX_VERSION_ID) hanya naik bila matriks
+keputusan berubah (bukan bobot AHP); dipakai oleh store matriks (store.py).
+
+Payload di tabel ranking_cache disimpan tanpa pickle (lihat encode_payload):
+dict JSON biasa, atau objek kelas yang didaftarkan dengan @cache_type.
+Pembukuan cache (simpan, LRU, last_used) memakai koneksi sendiri, sehingga
+transaksi dan snapshot baca sesi pemanggil tidak ikut ter-commit.
+"""
+
+import io
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.sqlite import insert
+from . import db
+from .models import DataVersion, RankingCacheEntry
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSION_ID = 1
+MATRIX_VERSION_ID = 2
+
+_local = OrderedDict()  # (database url, key, version) -> payload
+_local_lock = threading.Lock()
+
+CACHE_TYPES = {}
+
+
+def _read_version(row_id: int) -> int:
+    version = db.session.execute(select(DataVersion.version).where(DataVersion.id == row_id)).scalar()
+    return int(version or 0)
+
+
+def _bump(row_id: int):
+    res = db.session.execute(
+        update(DataVersion).where(DataVersion.id == row_id).values(version=DataVersion.version + 1)
+    )
+    if res.rowcount == 0:
+        db.session.add(DataVersion(id=row_id, version=1))
+        db.session.flush()
+
+
+def current_data_version() -> int:
+    return _read_version(DATA_VERSION_ID)
+
+
+def current_matrix_version() -> int:
+    return _read_version(MATRIX_VERSION_ID)
+
+
+def bump_data_version(matrix: bool = True):
+    """
+    Naikkan versi data di sesi aktif; ikut ter-commit bersama perubahan data.
+    matrix=False untuk perubahan yang tidak menyentuh matriks keputusan (mis. bobot AHP).
+    """
+    _bump(DATA_VERSION_ID)
+    if matrix:
+        _bump(MATRIX_VERSION_ID)
+
+
+def _local_key(key, version):
+    # satu proses bisa melayani lebih dari satu database (mis. benchmark)
+    return (current_app.config["SQLALCHEMY_DATABASE_URI"], key, version)
+
+
+def _local_get(key, version):
+    lk = _local_key(key, version)
+    with _local_lock:
+        payload = _local.get(lk)
+        if payload is not None:
+            _local.move_to_end(lk)
+        return payload
+
+
+def _local_put(key, version, payload):
+    size = current_app.config.get("RANKING_CACHE_LOCAL_SIZE", 32)
+    lk = _local_key(key, version)
+    with _local_lock:
+        _local[lk] = payload
+        _local.move_to_end(lk)
+        while len(_local) > size:
+            _local.popitem(last=False)
+
+
+def cache_type(cls):
+    """
+    Daftarkan kelas yang boleh disimpan di ranking_cache. Atribut ndarray
+    disimpan sebagai array .npz, sisanya sebagai JSON; saat dibaca objek
+    dibangun ulang lewat __new__ + __dict__ (tanpa __init__).
+    """
+    CACHE_TYPES[cls.__name__] = cls
+    return cls
+
+
+def _json_default(value):
+    import numpy as np
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} tidak bisa disimpan sebagai JSON")
+
+
+def encode_payload(payload) -> bytes:
+    """
+    Payload -> bytes .npz. Array object (teks/None) disimpan sebagai array
+    unicode + mask None, sehingga decode_payload bisa memakai allow_pickle=False.
+    """
+    import numpy as np
+    arrays = {}
+    if isinstance(payload, dict):
+        doc = {"type": None, "value": payload}
+    else:
+        name = type(payload).__name__
+        if CACHE_TYPES.get(name) is not type(payload):
+            raise TypeError(f"{name} belum didaftarkan dengan cache_type")
+        meta = {}
+        for attr, value in vars(payload).items():
+            if not isinstance(value, np.ndarray):
+                meta[attr] = value
+            elif value.dtype == object:
+                arrays[f"str.{attr}"] = np.array(["" if v is None else str(v) for v in value], dtype=str)
+                arrays[f"none.{attr}"] = np.array([v is None for v in value], dtype=bool)
+            else:
+                arrays[f"arr.{attr}"] = value
+        doc = {"type": name, "value": meta}
+    buf = io.BytesIO()
+    np.savez(buf, meta=np.array(json.dumps(doc, default=_json_default)), **arrays)
+    return buf.getvalue()
+
+
+def decode_payload(data: bytes):
+    """Kebalikan encode_payload; tidak pernah menjalankan pickle."""
+    import numpy as np
+    with np.load(io.BytesIO(data), allow_pickle=False) as z:
+        doc = json.loads(str(z["meta"]))
+        if doc["type"] is None:
+            return doc["value"]
+        cls = CACHE_TYPES[doc["type"]]
+        state = doc["value"]
+        for name in z.files:
+            kind, _, attr = name.partition(".")
+            if kind == "arr":
+                state[attr] = z[name]
+            elif kind == "str":
+                values = np.array(z[name].tolist(), dtype=object)
+                values[z[f"none.{attr}"]] = None
+                state[attr] = values
+    obj = cls.__new__(cls)
+    obj.__dict__.update(state)
+    return obj
+
+
+def get_cached(key: str, version: int):
+    """Ambil payload untuk (key, version); None jika tidak ada."""
+    payload = _local_get(key, version)
+    if payload is not None:
+        return payload
+
+    entry = db.session.execute(
+        select(RankingCacheEntry.version, RankingCacheEntry.payload, RankingCacheEntry.last_used)
+        .where(RankingCacheEntry.key == key)
+    ).first()
+    if entry is None or entry.version != version:
+        return None
+    try:
+        payload = decode_payload(entry.payload)
+    except Exception as e:
+        logger.warning("Gagal membaca cache ranking %s: %s", key, e)
+        return None
+
+    # last_used hanya disegarkan sesekali: setiap hit tidak perlu mengambil write lock SQLite
+    now = time.time()
+    if now - entry.last_used >= current_app.config.get("RANKING_CACHE_TOUCH_INTERVAL", 60):
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(update(RankingCacheEntry).where(RankingCacheEntry.key == key).values(last_used=now))
+        except Exception as e:
+            logger.warning("Gagal menyegarkan last_used cache ranking %s: %s", key, e)
+
+    _local_put(key, version, payload)
+    return payload
+
+
+def put_cached(key: str, version: int, payload):
+    """Simpan payload lalu buang entri basi/terlama (LRU) dari tabel ranking_cache."""
+    _local_put(key, version, payload)
+
+    max_entries = current_app.config.get("RANKING_CACHE_MAX_ENTRIES", 128)
+    try:
+        values = {"version": version, "payload": encode_payload(payload), "last_used": time.time()}
+        with db.engine.begin() as conn:
+            stmt = insert(RankingCacheEntry.__table__).values(key=key, **values)
+            conn.execute(stmt.on_conflict_do_update(index_elements=["key"], set_=values))
+            conn.execute(delete(RankingCacheEntry).where(RankingCacheEntry.version < version))
+            keep = select(RankingCacheEntry.key).order_by(RankingCacheEntry.last_used.desc()).limit(max_entries)
+            conn.execute(delete(RankingCacheEntry).where(RankingCacheEntry.key.not_in(keep)))
+    except Exception as e:
+        logger.warning("Gagal menyimpan cache ranking %s: %s", key, e)
+
+
+def cached(key: str, compute, persist: bool = True):
+    """
+    Ambil hasil dari cache untuk versi data saat ini, atau hitung dengan
+    compute(). Jika compute() mengembalikan None, hasil tidak disimpan.
+    persist=False: hanya cache per proses (untuk objek besar seperti matriks).
+    """
+    version = current_data_version()
+    if not persist:
+        payload = _local_get(key, version)
+        if payload is None:
+            payload = compute()
+            if payload is not None:
+                _local_put(key, version, payload)
+        return payload
+
+    payload = get_cached(key, version)
+    if payload is None:
+        payload = compute()
+        if payload is not None:
+            put_cached(key, version, payload)
+    return payload
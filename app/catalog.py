@@ -0,0 +1,273 @@
+"""
+catalog.py - Import / export katalog alternatif + nilai (CSV / Parquet)
+
+Format file: kolom name, brand, sport, source_title, source_url, lalu satu
+kolom per kriteria (judul kolom = Criterion.name). File dibaca per chunk,
+setiap chunk divalidasi terhadap kriteria yang ada lalu ditulis dengan
+upsert massal; baris yang tidak valid dilaporkan, bukan menggagalkan semua.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+from itertools import groupby
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from . import db
+from .cache import bump_data_version
+from .forms import URL_REJECT
+from .matrix import upsert_values
+from .models import Criterion, Alternative, AlternativeValue
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BASE_COLUMNS = ["name", "brand", "sport", "source_title", "source_url"]
+URL_PATTERN = r"^https?://[^\s/$.?#][^\s]*$"
+
+# (kolom, min, max) panjang teks, mengikuti AlternativeForm
+TEXT_RULES = [
+    ("name", 3, 160),
+    ("brand", 0, 80),
+    ("sport", 0, 80),
+    ("source_title", 5, 200),
+    ("source_url", 1, 500),
+]
+
+
+class ImportReport:
+    """Ringkasan hasil import."""
+
+    def __init__(self):
+        self.imported = 0
+        self.chunks = 0
+        self.errors = []  # (nomor baris file, pesan)
+
+    @property
+    def rejected(self) -> int:
+        return len({row for row, _ in self.errors})
+
+
+def _read_chunks(stream, fmt: str, chunksize: int):
+    import pandas as pd
+    if fmt == "csv":
+        yield from pd.read_csv(stream, chunksize=chunksize, dtype=str, keep_default_na=False)
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Import Parquet membutuhkan paket pyarrow.")
+        for batch in pq.ParquetFile(stream).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Format tidak didukung: {fmt}")
+
+
+def _validate_chunk(df: pd.DataFrame, criteria, first_line: int, report: ImportReport):
+    """
+    Validasi satu chunk secara vektor. Return (teks, nilai numerik, mask baris valid).
+    """
+    import numpy as np
+    import pandas as pd
+    text = {col: df[col].fillna("").astype(str).str.strip() for col in BASE_COLUMNS if col in df}
+    for col in BASE_COLUMNS:
+        text.setdefault(col, pd.Series([""] * len(df), index=df.index))
+    values = np.column_stack([
+        pd.to_numeric(df[c.name], errors="coerce").to_numpy(dtype=float) for c in criteria
+    ]) if criteria else np.empty((len(df), 0))
+
+    problems = []  # (mask, pesan)
+    for col, lo, hi in TEXT_RULES:
+        length = text[col].str.len()
+        problems.append(((length < lo) | (length > hi), f"{col} harus {lo}-{hi} karakter"))
+    url = text["source_url"]
+    problems.append((~url.str.match(URL_PATTERN) & (url != ""), "source_url bukan URL yang valid"))
+    problems.append((url.map(lambda u: URL_REJECT.search(u) is not None), "source_url tidak boleh localhost/127.0.0.1"))
+    problems.append((text["name"].duplicated(keep="last"), "name duplikat dalam file (baris terakhir dipakai)"))
+    for j, c in enumerate(criteria):
+        problems.append((~np.isfinite(values[:, j]), f"nilai '{c.name}' kosong/tidak numerik"))
+
+    ok = np.ones(len(df), dtype=bool)
+    for mask, msg in problems:
+        mask = np.asarray(mask, dtype=bool)
+        ok &= ~mask
+        for pos in np.flatnonzero(mask):
+            report.errors.append((first_line + int(pos), msg))
+    return text, values, ok
+
+
+def import_catalog(stream, fmt: str = "csv", chunksize: int = 1000, on_chunk=None) -> ImportReport:
+    """
+    Import Alternative + AlternativeValue dari CSV/Parquet secara bertahap.
+    Alternatif dengan nama yang sudah ada akan diperbarui (upsert by name).
+    on_chunk(report) dipanggil setelah setiap chunk selesai (mis. untuk progres job).
+    """
+    import numpy as np
+    criteria = db.session.execute(select(Criterion.id, Criterion.name).order_by(Criterion.id)).all()
+    if not criteria:
+        raise ValueError("Tambahkan kriteria terlebih dahulu sebelum import.")
+
+    report = ImportReport()
+    line = 2  # baris 1 = header
+    for chunk_no, df in enumerate(_read_chunks(stream, fmt, chunksize)):
+        if chunk_no == 0:
+            missing = [col for col in ["name", "source_title", "source_url"] + [c.name for c in criteria] if col not in df.columns]
+            if missing:
+                raise ValueError(f"Kolom wajib tidak ada: {', '.join(missing)}")
+
+        df = df.reset_index(drop=True)
+        text, values, ok = _validate_chunk(df, criteria, line, report)
+        line += len(df)
+        if not ok.any():
+            if on_chunk:
+                on_chunk(report)
+            continue
+
+        idx = np.flatnonzero(ok)
+        alt_rows = [
+            {
+                "name": text["name"][i],
+                "brand": text["brand"][i] or None,
+                "sport": text["sport"][i] or None,
+                "source_title": text["source_title"][i],
+                "source_url": text["source_url"][i],
+            }
+            for i in idx
+        ]
+        stmt = insert(Alternative.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={col: stmt.excluded[col] for col in ["brand", "sport", "source_title", "source_url"]},
+        )
+        try:
+            db.session.execute(stmt, alt_rows)
+            ids = dict(db.session.execute(
+                select(Alternative.name, Alternative.id).where(Alternative.name.in_([r["name"] for r in alt_rows]))
+            ).all())
+            upsert_values([
+                {"alternative_id": ids[alt_rows[k]["name"]], "criterion_id": c.id, "value": float(values[i, j])}
+                for k, i in enumerate(idx)
+                for j, c in enumerate(criteria)
+            ])
+            bump_data_version()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        report.imported += len(idx)
+        report.chunks += 1
+        logger.info("Import chunk %d: %d baris", chunk_no, len(idx))
+        if on_chunk:
+            on_chunk(report)
+
+    report.errors.sort()
+    return report
+
+
+def iter_catalog_rows(batch_size: int = 1000):
+    """
+    Generator baris katalog (header dulu) langsung dari cursor database,
+    tanpa memuat seluruh matriks ke memori.
+    """
+    criteria = db.session.execute(select(Criterion.id, Criterion.name).order_by(Criterion.id)).all()
+    col_of = {c.id: j for j, c in enumerate(criteria)}
+    yield BASE_COLUMNS + [c.name for c in criteria]
+
+    rows = db.session.execute(
+        select(
+            Alternative.id, Alternative.name, Alternative.brand, Alternative.sport,
+            Alternative.source_title, Alternative.source_url,
+            AlternativeValue.criterion_id, AlternativeValue.value,
+        )
+        .outerjoin(AlternativeValue, AlternativeValue.alternative_id == Alternative.id)
+        .order_by(Alternative.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for _, group in groupby(rows, key=lambda r: r.id):
+        group = list(group)
+        first = group[0]
+        cells = [""] * len(criteria)
+        for r in group:
+            if r.criterion_id in col_of:
+                cells[col_of[r.criterion_id]] = r.value
+        yield [first.name, first.brand or "", first.sport or "", first.source_title, first.source_url] + cells
+
+
+def export_csv(batch_size: int = 1000):
+    """Generator potongan teks CSV untuk Response streaming."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for n, row in enumerate(iter_catalog_rows(batch_size), start=1):
+        writer.writerow(row)
+        if n % batch_size == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+class _StreamSink(io.RawIOBase):
+    """Sink tulis-saja untuk ParquetWriter; isinya dikuras tiap row group."""
+
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def export_parquet(batch_size: int = 1000):
+    """Generator potongan bytes Parquet (satu row group per batch)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Export Parquet membutuhkan paket pyarrow.")
+
+    rows = iter_catalog_rows(batch_size)
+    header = next(rows)
+    schema = pa.schema(
+        [(col, pa.string()) for col in BASE_COLUMNS] + [(col, pa.float64()) for col in header[len(BASE_COLUMNS):]]
+    )
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    def flush(batch):
+        columns = list(zip(*batch))
+        numeric = [[None if v == "" else v for v in col] for col in columns[len(BASE_COLUMNS):]]
+        writer.write_table(pa.table(list(columns[:len(BASE_COLUMNS)]) + numeric, schema=schema))
+        return sink.drain()
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield flush(batch)
+            batch = []
+    if batch:
+        yield flush(batch)
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,43 @@
+"""
+engine.py - Tuning engine SQLite (pragma per koneksi + opsi pool)
+
+Pragma diambil dari Config.SQLITE_PRAGMAS dan dijalankan setiap kali pool
+membuka koneksi baru:
+  - journal_mode=WAL     : pembaca tidak diblok penulis (worker web + job)
+  - synchronous=NORMAL   : aman untuk WAL, fsync jauh lebih sedikit
+  - foreign_keys=ON      : ondelete="CASCADE" di models benar-benar berlaku
+  - mmap_size/cache_size : halaman database dibaca dari memori
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def _is_sqlite_file(uri: str) -> bool:
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def engine_options(app):
+    """Isi SQLALCHEMY_ENGINE_OPTIONS (pool) untuk database file SQLite; dipanggil sebelum db.init_app."""
+    if not _is_sqlite_file(app.config["SQLALCHEMY_DATABASE_URI"]):
+        return
+    options = dict(app.config.get("SQLITE_POOL_OPTIONS", {}))
+    options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+
+def install_pragmas(app, engine):
+    """Jalankan SQLITE_PRAGMAS di setiap koneksi DBAPI baru milik engine."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = app.config.get("SQLITE_PRAGMAS", {})
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
@@ -1,6 +1,7 @@
 import re
 from flask_wtf import FlaskForm
-from wtforms import StringField, SelectField, FloatField, SubmitField
+from flask_wtf.file import FileField, FileRequired, FileAllowed
+from wtforms import StringField, SelectField, FloatField, SubmitField, BooleanField
 from wtforms.validators import DataRequired, Length, URL, NumberRange, ValidationError, Optional
 
 URL_REJECT = re.compile(r"(localhost|127\.0\.0\.1)", re.IGNORECASE)
@@ -31,3 +32,8 @@ class AlternativeForm(FlaskForm):
 
 class PairwiseCellForm(FlaskForm):
     value = FloatField("Nilai", validators=[DataRequired(), NumberRange(min=1/9, max=9)])
+
+class CatalogImportForm(FlaskForm):
+    file = FileField("File Katalog (CSV / Parquet)", validators=[FileRequired(), FileAllowed(["csv", "parquet"], "Hanya file .csv atau .parquet")])
+    background = BooleanField("Proses di latar belakang (file besar)")
+    submit = SubmitField("Import")
@@ -0,0 +1,254 @@
+"""
+group.py - Penilaian AHP per penilai + agregasi kelompok (Group AHP)
+
+Setiap penilai menyimpan matriks pairwise-nya sendiri (evaluator_pairwise).
+State agregasi (GroupAggregate: log-matriks, bobot dan CR tiap penilai,
+jumlah berbobot) disimpan satu baris di group_ahp_state dan diperbarui
+inkremental dalam transaksi yang sama saat satu penilai mengirim ulang:
+hanya matriks penilai itu yang dihitung, jumlahnya dikoreksi selisihnya.
+
+State dibangun ulang penuh (satu pass batch (R, n, n) atas semua penilai
+yang matriksnya lengkap) bila belum ada, kriteria berubah, atau penulisan
+state bentrok dengan penulis lain.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import pickle
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from flask import current_app
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from . import db
+from .cache import bump_data_version
+from .methods import AHP, GroupAggregate
+from .models import AhpResult, Criterion, Evaluator, EvaluatorPairwise, GroupAhpState, Pairwise
+from .profiling import timed
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _crit_ids():
+    return [cid for (cid,) in db.session.execute(select(Criterion.id).order_by(Criterion.id))]
+
+
+def matrix_from_pairs(crit_ids, pairs: dict) -> np.ndarray:
+    """{(ci, cj): nilai} segitiga atas (ci < cj) -> matriks resiprokal n x n lengkap."""
+    import numpy as np
+    n = len(crit_ids)
+    mat = np.ones((n, n), dtype=float)
+    for i in range(n):
+        for j in range(i + 1, n):
+            val = pairs.get((crit_ids[i], crit_ids[j]))
+            if val is None:
+                raise ValueError("Ada nilai perbandingan berpasangan yang kosong.")
+            val = float(val)
+            if not val > 0:
+                raise ValueError("Nilai AHP harus > 0.")
+            mat[i, j] = val
+            mat[j, i] = 1.0 / val
+    return mat
+
+
+def build_aggregate(crit_ids, method: str) -> GroupAggregate:
+    """Bangun state dari evaluator_pairwise; penilai yang matriksnya belum lengkap dilewati."""
+    import numpy as np
+    n = len(crit_ids)
+    raters = db.session.execute(select(Evaluator.id, Evaluator.weight).order_by(Evaluator.id)).all()
+    if n < 2 or not raters:
+        return GroupAggregate(crit_ids, method)
+    rater_ids = np.array([r.id for r in raters], dtype=np.int64)
+    rows = db.session.execute(select(
+        EvaluatorPairwise.evaluator_id, EvaluatorPairwise.criterion_i_id,
+        EvaluatorPairwise.criterion_j_id, EvaluatorPairwise.value,
+    )).all()
+    ids = np.asarray(crit_ids, dtype=np.int64)
+    logs = np.zeros((rater_ids.size, n, n))
+    filled = np.zeros(rater_ids.size, dtype=np.int64)
+    if rows:
+        e, ci, cj, v = (np.array(col) for col in zip(*rows))
+        r = np.searchsorted(rater_ids, e)
+        i = np.minimum(np.searchsorted(ids, ci), n - 1)
+        j = np.minimum(np.searchsorted(ids, cj), n - 1)
+        ok = (ids[i] == ci) & (ids[j] == cj) & (i < j) & (v > 0)
+        r, i, j, log_v = r[ok], i[ok], j[ok], np.log(v[ok].astype(float))
+        logs[r, i, j] = log_v
+        logs[r, j, i] = -log_v
+        filled = np.bincount(r, minlength=rater_ids.size)
+    complete = filled == n * (n - 1) // 2
+    weights = np.array([r.weight for r in raters], dtype=float)
+    return GroupAggregate(crit_ids, method, rater_ids[complete], weights[complete], logs[complete])
+
+
+def _load():
+    """(versi, GroupAggregate) dari database, atau (None, None)."""
+    row = db.session.execute(select(GroupAhpState.version, GroupAhpState.payload).where(GroupAhpState.id == 1)).first()
+    if row is None:
+        return None, None
+    return row.version, GroupAggregate.from_state(pickle.loads(row.payload))
+
+
+def _save(agg: GroupAggregate, version):
+    """Tulis state ke sesi aktif (commit oleh pemanggil); bentrok versi -> state dihapus (dibangun ulang nanti)."""
+    payload = pickle.dumps(agg.state(), protocol=pickle.HIGHEST_PROTOCOL)
+    if version is None:
+        db.session.execute(insert(GroupAhpState.__table__).values(id=1, version=1, payload=payload)
+                           .on_conflict_do_nothing(index_elements=["id"]))
+        return
+    res = db.session.execute(
+        update(GroupAhpState).where(GroupAhpState.id == 1, GroupAhpState.version == version)
+        .values(version=version + 1, payload=payload)
+    )
+    if res.rowcount == 0:
+        logger.warning("State group AHP diubah penulis lain; dibangun ulang saat dibaca berikutnya.")
+        db.session.execute(delete(GroupAhpState))
+
+
+def _state():
+    """(versi, state) yang sesuai kriteria saat ini; dibangun ulang bila perlu."""
+    crit_ids = _crit_ids()
+    version, agg = _load()
+    if agg is None or agg.crit_ids.tolist() != crit_ids:
+        with timed("group_ahp"):
+            agg = build_aggregate(crit_ids, current_app.config["AHP_WEIGHT_METHOD"])
+        if version is not None:
+            db.session.execute(delete(GroupAhpState))
+        version = None
+    return version, agg
+
+
+def get_group_aggregate(method: str = None) -> GroupAggregate:
+    """State agregasi kelompok (metode bobot default: AHP_WEIGHT_METHOD)."""
+    version, agg = _state()
+    if version is None:
+        try:
+            _save(agg, None)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("Gagal menyimpan state group AHP: %s", e)
+    return agg.with_method(method or agg.method)
+
+
+def submit_judgments(name: str, matrix: np.ndarray, crit_ids, weight: float = None):
+    """
+    Simpan matriks pairwise penilai `name` (dibuat bila belum ada) untuk
+    kriteria `crit_ids`, lalu perbarui state secara inkremental.
+    Return (Evaluator, bobot penilai (n,), CR).
+    """
+    import numpy as np
+    name = (name or "").strip()
+    if not name:
+        raise ValueError("Nama penilai wajib diisi.")
+    if weight is not None and not weight >= 0:
+        raise ValueError("Bobot penilai harus >= 0.")
+    version, agg = _state()
+    if list(crit_ids) != agg.crit_ids.tolist():
+        raise ValueError("Kriteria berubah; muat ulang formulir perbandingan.")
+    n = len(crit_ids)
+    if n < 2:
+        raise ValueError("Tambahkan minimal 2 kriteria untuk AHP.")
+
+    evaluator = Evaluator.query.filter_by(name=name).first()
+    if evaluator is None:
+        evaluator = Evaluator(name=name, weight=1.0 if weight is None else weight)
+        db.session.add(evaluator)
+        db.session.flush()
+    else:
+        if weight is not None:
+            evaluator.weight = weight
+        evaluator.updated_at = datetime.utcnow()
+
+    stmt = insert(EvaluatorPairwise.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["evaluator_id", "criterion_i_id", "criterion_j_id"], set_={"value": stmt.excluded.value}
+    )
+    iu = np.triu_indices(n, 1)
+    db.session.execute(stmt, [
+        {"evaluator_id": evaluator.id, "criterion_i_id": crit_ids[i], "criterion_j_id": crit_ids[j], "value": float(matrix[i, j])}
+        for i, j in zip(*iu)
+    ])
+    priorities, cr = agg.upsert(evaluator.id, matrix, evaluator.weight)
+    _save(agg, version)
+    db.session.commit()
+    return evaluator, priorities, cr
+
+
+def remove_evaluator(evaluator_id: int) -> bool:
+    evaluator = db.session.get(Evaluator, evaluator_id)
+    if evaluator is None:
+        return False
+    version, agg = _state()
+    db.session.delete(evaluator)
+    agg.remove(evaluator_id)
+    _save(agg, version)
+    db.session.commit()
+    return True
+
+
+def list_evaluators(agg: GroupAggregate = None):
+    """Semua penilai + bobot/CR individu (None bila matriksnya belum lengkap)."""
+    agg = agg or get_group_aggregate()
+    results = agg.rater_results()
+    return [
+        {
+            "id": e.id,
+            "name": e.name,
+            "weight": e.weight,
+            "complete": e.id in results,
+            "cr": results.get(e.id, {}).get("cr"),
+            "weights": results.get(e.id, {}).get("weights"),
+            "updated_at": e.updated_at.isoformat() if e.updated_at else None,
+        }
+        for e in Evaluator.query.order_by(Evaluator.id).all()
+    ]
+
+
+def run_group_ahp(mode: str = "aij", method: str = None, max_cr: float = None) -> dict:
+    """
+    Agregasikan semua penilai -> AhpResult baru. Untuk mode "aij" matriks
+    kelompok juga disimpan sebagai matriks pairwise utama.
+    """
+    import numpy as np
+    from .ranking import materialize_ranking
+
+    method = method or current_app.config["AHP_WEIGHT_METHOD"]
+    if method not in AHP.METHODS:
+        raise ValueError(f"Metode bobot tidak dikenal: {method}")
+    agg = get_group_aggregate(method)
+    with timed("group_ahp"):
+        result = agg.aggregate(mode, max_cr=max_cr)
+
+    if mode == "aij":
+        ids = agg.crit_ids.tolist()
+        stmt = insert(Pairwise.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["criterion_i_id", "criterion_j_id"], set_={"value": stmt.excluded.value}
+        )
+        iu = np.triu_indices(len(ids), 1)
+        db.session.execute(stmt, [
+            {"criterion_i_id": ids[i], "criterion_j_id": ids[j], "value": float(result["matrix"][i, j])}
+            for i, j in zip(*iu)
+        ])
+    ahp_result = AhpResult(weights_json=json.dumps(result["weights"]), cr=float(result["cr"]))
+    db.session.add(ahp_result)
+    bump_data_version(matrix=False)
+    db.session.commit()
+    materialize_ranking()
+    return {
+        "ahp_result_id": ahp_result.id,
+        "mode": mode,
+        "method": method,
+        "cr": float(result["cr"]),
+        "weights": result["weights"],
+        "raters": result["raters"],
+        "excluded": result["excluded"],
+    }
@@ -0,0 +1,307 @@
+"""
+jobs.py - Runner pekerjaan latar belakang (AHP, sensitivitas, import massal)
+
+Pekerjaan dicatat di tabel jobs lalu dijalankan oleh thread pool di proses
+yang menerimanya. Status dan progres ditulis balik ke tabel, sehingga
+endpoint status di worker manapun cukup membaca satu baris.
+
+Selama job queued/running, thread heartbeat proses pemiliknya menyegarkan
+heartbeat_at. Bila proses mati/restart, heartbeat berhenti dan
+expire_stale_jobs() (saat boot dan saat status job dibaca) menandai job
+tersebut failed serta menghapus file import sementaranya.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, select, update
+
+from . import db
+from .models import Job, Criterion, Pairwise, AhpResult
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+ACTIVE = ("queued", "running")
+IMPORT_PREFIX = "spk-import-"  # prefix file sementara import latar belakang
+INTERRUPTED = "Terhenti (interrupted): worker berhenti sebelum job selesai."
+
+
+def job_handler(kind: str):
+    """Daftarkan fungsi handler(params, progress) -> dict hasil (JSON-able)."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Heartbeat:
+    """
+    Thread daemon per proses yang menyegarkan heartbeat_at job aktif milik
+    proses ini tiap `interval` detik. Dimulai saat job pertama dikirim, dan
+    tidak menulis apa pun selama tidak ada job aktif.
+    """
+
+    def __init__(self, app, interval: float):
+        self.app = app
+        self.interval = interval
+        self.active = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def add(self, job_id: int):
+        with self.lock:
+            self.active.add(job_id)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._loop, name="spk-job-heartbeat", daemon=True)
+                self.thread.start()
+
+    def discard(self, job_id: int):
+        with self.lock:
+            self.active.discard(job_id)
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                ids = list(self.active)
+            if not ids:
+                continue
+            try:
+                with self.app.app_context():
+                    with db.engine.begin() as conn:
+                        conn.execute(update(Job).where(Job.id.in_(ids), Job.status.in_(ACTIVE))
+                                     .values(heartbeat_at=datetime.utcnow()))
+            except Exception as e:
+                logger.warning("Gagal menyegarkan heartbeat job: %s", e)
+
+
+def init_jobs(app):
+    app.extensions["jobs"] = ThreadPoolExecutor(
+        max_workers=app.config.get("JOB_WORKERS", 2), thread_name_prefix="spk-job"
+    )
+    app.extensions["jobs_heartbeat"] = Heartbeat(app, app.config.get("JOB_HEARTBEAT_SECONDS", 15))
+
+
+def submit_job(app, kind: str, params: dict) -> Job:
+    """Catat pekerjaan baru lalu jadwalkan di thread pool aplikasi."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Jenis pekerjaan tidak dikenal: {kind}")
+    job = Job(kind=kind, status="queued", params_json=json.dumps(params),
+              worker=_worker_id(), heartbeat_at=datetime.utcnow())
+    db.session.add(job)
+    db.session.commit()
+    app.extensions["jobs_heartbeat"].add(job.id)
+    app.extensions["jobs"].submit(_run, app, job.id)
+    return job
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except (OSError, TypeError):
+        pass
+
+
+def expire_stale_jobs(stale_after: float = None) -> int:
+    """
+    Job queued/running yang heartbeat-nya lebih tua dari `stale_after` detik
+    (default JOB_STALE_SECONDS) -> failed dengan pesan "interrupted"; file
+    import sementaranya dihapus. Return jumlah job yang ditandai. Tanpa job
+    basi hanya satu SELECT.
+    """
+    from flask import current_app
+
+    if stale_after is None:
+        stale_after = current_app.config.get("JOB_STALE_SECONDS", 120)
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    stale = (Job.status.in_(ACTIVE), or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < cutoff))
+    rows = db.session.execute(select(Job.id, Job.kind, Job.params_json).where(*stale)).all()
+    if not rows:
+        return 0
+    with db.engine.begin() as conn:
+        expired = conn.execute(
+            update(Job).where(Job.id.in_([r.id for r in rows]), *stale)
+            .values(status="failed", message=INTERRUPTED, finished_at=datetime.utcnow())
+        ).rowcount
+    for r in rows:
+        if r.kind == "import":
+            _remove_file(json.loads(r.params_json or "{}").get("path"))
+    logger.warning("%d job basi ditandai failed (interrupted).", expired)
+    return expired
+
+
+def sweep_import_files(stale_after: float = None) -> int:
+    """Hapus file import sementara yang lebih tua dari `stale_after` detik dan tidak dipakai job aktif."""
+    from flask import current_app
+
+    if stale_after is None:
+        stale_after = current_app.config.get("JOB_STALE_SECONDS", 120)
+    in_use = {
+        json.loads(p or "{}").get("path")
+        for (p,) in db.session.execute(select(Job.params_json).where(Job.kind == "import", Job.status.in_(ACTIVE)))
+    }
+    tmpdir = tempfile.gettempdir()
+    cutoff = time.time() - stale_after
+    removed = 0
+    for name in os.listdir(tmpdir):
+        if not name.startswith(IMPORT_PREFIX):
+            continue
+        path = os.path.join(tmpdir, name)
+        try:
+            if path in in_use or os.path.getmtime(path) >= cutoff:
+                continue
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def recover_jobs(app):
+    """Saat boot: tandai job yang terputus oleh proses sebelumnya dan bersihkan file import sisa."""
+    with app.app_context():
+        try:
+            expire_stale_jobs()
+            sweep_import_files()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("Gagal membersihkan job terputus: %s", e)
+        finally:
+            db.session.remove()
+
+
+def _set(job_id: int, **values):
+    """Update baris job lewat koneksi tersendiri (tidak ikut transaksi kerja)."""
+    with db.engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == job_id).values(**values))
+
+
+def _run(app, job_id: int):
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        if job is None:
+            return
+        _set(job_id, status="running", started_at=datetime.utcnow(), worker=_worker_id(), heartbeat_at=datetime.utcnow())
+
+        def progress(fraction: float, message: str = None):
+            values = {"progress": float(min(max(fraction, 0.0), 1.0))}
+            if message is not None:
+                values["message"] = message[:500]
+            _set(job_id, **values)
+
+        try:
+            result = HANDLERS[job.kind](json.loads(job.params_json), progress)
+            _set(job_id, status="done", progress=1.0, result_json=json.dumps(result), finished_at=datetime.utcnow())
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Job %s (%s) gagal: %s\n%s", job_id, job.kind, e, traceback.format_exc())
+            _set(job_id, status="failed", message=str(e)[:500], finished_at=datetime.utcnow())
+        finally:
+            app.extensions["jobs_heartbeat"].discard(job_id)
+            db.session.remove()
+
+
+def job_status(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "message": job.message,
+        "params": json.loads(job.params_json),
+        "result": json.loads(job.result_json) if job.result_json else None,
+        "worker": job.worker,
+        "heartbeat_at": job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+@job_handler("ahp")
+def _ahp_job(params, progress):
+    """Hitung ulang bobot AHP dari matriks pairwise tersimpan -> baris AhpResult baru."""
+    import numpy as np
+    from .cache import bump_data_version
+    from .methods import AHP
+    from .ranking import materialize_ranking
+
+    method = params.get("method", "normalization")
+    criteria = Criterion.query.order_by(Criterion.id).all()
+    n = len(criteria)
+    if n < 2:
+        raise ValueError("Tambahkan minimal 2 kriteria untuk AHP.")
+
+    index = {c.id: k for k, c in enumerate(criteria)}
+    mat = np.ones((n, n), dtype=float)
+    filled = np.eye(n, dtype=bool)
+    for p in Pairwise.query.all():
+        if p.criterion_i_id in index and p.criterion_j_id in index:
+            i, j = index[p.criterion_i_id], index[p.criterion_j_id]
+            mat[i, j], mat[j, i] = p.value, 1.0 / p.value
+            filled[i, j] = filled[j, i] = True
+    if not filled.all():
+        raise ValueError("Matriks perbandingan berpasangan belum lengkap.")
+    progress(0.3, "Matriks pairwise dimuat")
+
+    weights, cr = AHP.calculate_weights(mat, method=method)
+    weights_map = {criteria[k].id: float(weights[k]) for k in range(n)}
+    result = AhpResult(weights_json=json.dumps(weights_map), cr=float(cr))
+    db.session.add(result)
+    bump_data_version(matrix=False)
+    db.session.commit()
+    progress(0.8, "Bobot disimpan, menulis snapshot ranking")
+    materialize_ranking()
+    return {"ahp_result_id": result.id, "cr": float(cr), "method": method, "weights": weights_map}
+
+
+@job_handler("sensitivity")
+def _sensitivity_job(params, progress):
+    """Jalankan analisis sensitivitas; hasil masuk cache versi data + baris job."""
+    from flask import current_app
+    from .ranking import sensitivity_report
+
+    progress(0.05, f"{params.get('samples')} sampel")
+    result = sensitivity_report(params, workers=current_app.config.get("SENSITIVITY_WORKERS", 0))
+    if result is None:
+        raise ValueError("Data alternatif belum lengkap atau AHP belum dijalankan.")
+    return result
+
+
+@job_handler("import")
+def _import_job(params, progress):
+    """Import katalog dari file sementara yang diunggah; file dihapus setelah selesai."""
+    from .catalog import import_catalog
+
+    path = params["path"]
+    total = max(1, params.get("size", 1))
+    try:
+        with open(path, "rb") as f:
+            def on_chunk(report):
+                progress(f.tell() / total * 0.99, f"{report.imported} baris disimpan, {report.rejected} ditolak")
+
+            report = import_catalog(f, params.get("format", "csv"), chunksize=params.get("chunksize", 1000), on_chunk=on_chunk)
+    finally:
+        _remove_file(path)
+    return {
+        "imported": report.imported,
+        "rejected": report.rejected,
+        "errors": report.errors[:params.get("max_errors", 100)],
+        "total_errors": len(report.errors),
+    }
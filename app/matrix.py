@@ -0,0 +1,156 @@
+"""
+matrix.py - Loader matriks keputusan (alternatif x kriteria)
+"""
+
+from __future__ import annotations
+
+from functools import cached_property
+from itertools import chain
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from . import db
+from .methods import ProfileMatching
+from .models import Criterion, Alternative, AlternativeValue
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class DecisionMatrix:
+    """
+    Matriks keputusan padat hasil satu kali baca database.
+
+    Attributes:
+        criteria: baris kriteria (id, name, ctype, unit), urut id
+        alternatives: baris alternatif (id, name, brand, sport, source_url), urut id
+        values: float (m x n), NaN untuk sel yang belum diisi
+        present: bool (m x n), True jika sel punya nilai
+        alt_index / crit_index: peta id -> indeks baris / kolom
+    """
+
+    def __init__(self, criteria, alternatives, values, present):
+        import numpy as np
+        self.criteria = criteria
+        self.alternatives = alternatives
+        self.values = values
+        self.present = present
+        self.alt_ids = np.array([a.id for a in alternatives], dtype=np.int64)
+        self.crit_ids = np.array([c.id for c in criteria], dtype=np.int64)
+        self.is_benefit = np.array([c.ctype == "benefit" for c in criteria], dtype=bool)
+
+    @cached_property
+    def alt_index(self):
+        return {a.id: i for i, a in enumerate(self.alternatives)}
+
+    @cached_property
+    def crit_index(self):
+        return {c.id: j for j, c in enumerate(self.criteria)}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.present.all())
+
+    def first_incomplete(self):
+        """Alternatif pertama (urut id) yang belum punya nilai untuk semua kriteria."""
+        import numpy as np
+        missing = ~self.present.all(axis=1)
+        if not missing.any():
+            return None
+        return self.alternatives[int(np.argmax(missing))]
+
+    def ideal_profile(self) -> np.ndarray:
+        """Profil ideal: benefit -> maksimum kolom, cost -> minimum kolom."""
+        return ProfileMatching.ideal_profile(self.values, self.is_benefit)
+
+    def gap_scores(self) -> np.ndarray:
+        """Skor gap per sel: 1 / (1 + |nilai - ideal|), matriks (m x n)."""
+        return ProfileMatching.gap_scores(self.values, self.ideal_profile())
+
+    def value_map(self) -> dict:
+        """{(alternative_id, criterion_id): value} untuk sel yang terisi."""
+        import numpy as np
+        rows, cols = np.nonzero(self.present)
+        return {
+            (int(self.alt_ids[i]), int(self.crit_ids[j])): float(self.values[i, j])
+            for i, j in zip(rows, cols)
+        }
+
+
+# kolom baris alternatif di DecisionMatrix.alternatives
+ALTERNATIVE_COLUMNS = (Alternative.id, Alternative.name, Alternative.brand, Alternative.sport, Alternative.source_url)
+
+
+def load_decision_matrix(alt_ids=None) -> DecisionMatrix:
+    """
+    Bangun DecisionMatrix dengan jumlah query tetap (3), berapapun ukuran katalog.
+
+    Args:
+        alt_ids: opsional, batasi ke alternatif ini (mis. satu halaman grid);
+                 baris mengikuti urutan alt_ids. None = semua, urut id.
+    """
+    import numpy as np
+    criteria = db.session.execute(
+        select(Criterion.id, Criterion.name, Criterion.ctype, Criterion.unit).order_by(Criterion.id)
+    ).all()
+    alt_query = select(*ALTERNATIVE_COLUMNS).order_by(Alternative.id)
+    value_query = select(AlternativeValue.alternative_id, AlternativeValue.criterion_id, AlternativeValue.value)
+    if alt_ids is not None:
+        alt_ids = [int(a) for a in alt_ids]
+        alt_query = alt_query.where(Alternative.id.in_(alt_ids))
+        value_query = value_query.where(AlternativeValue.alternative_id.in_(alt_ids))
+    alternatives = db.session.execute(alt_query).all()
+    if alt_ids is not None:
+        position = {a: k for k, a in enumerate(alt_ids)}
+        alternatives.sort(key=lambda a: position[a.id])
+    cells = db.session.execute(value_query).all()
+
+    m, n = len(alternatives), len(criteria)
+    values = np.full((m, n), np.nan, dtype=float)
+    present = np.zeros((m, n), dtype=bool)
+
+    if cells and m and n:
+        # fromiter atas nilai mentah jauh lebih cepat daripada np.array(list of Row)
+        raw = np.fromiter(chain.from_iterable(cells), dtype=float, count=3 * len(cells)).reshape(-1, 3)
+        alt_ids = np.array([a.id for a in alternatives], dtype=np.int64)
+        crit_ids = np.array([c.id for c in criteria], dtype=np.int64)
+        a_col = raw[:, 0].astype(np.int64)
+        c_col = raw[:, 1].astype(np.int64)
+
+        # id -> indeks via searchsorted; buang sel yatim
+        sorter = np.argsort(alt_ids, kind="stable")
+        ri = sorter[np.minimum(np.searchsorted(alt_ids, a_col, sorter=sorter), m - 1)]
+        ci = np.minimum(np.searchsorted(crit_ids, c_col), n - 1)
+        valid = (alt_ids[ri] == a_col) & (crit_ids[ci] == c_col)
+
+        values[ri[valid], ci[valid]] = raw[valid, 2]
+        present[ri[valid], ci[valid]] = True
+
+    return DecisionMatrix(criteria, alternatives, values, present)
+
+
+def upsert_values(rows) -> int:
+    """
+    Tulis banyak sel sekaligus: INSERT ... ON CONFLICT(uq_alt_crit) DO UPDATE,
+    dieksekusi sebagai executemany dalam sesi aktif (commit oleh pemanggil).
+
+    Args:
+        rows: list of dict {alternative_id, criterion_id, value}
+
+    Returns:
+        jumlah sel yang ditulis
+    """
+    if not rows:
+        return 0
+    stmt = insert(AlternativeValue.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["alternative_id", "criterion_id"],
+        set_={"value": stmt.excluded.value},
+    )
+    db.session.execute(stmt, rows)
+    return len(rows)
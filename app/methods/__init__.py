@@ -1,2 +1,7 @@
 from .ahp import AHP
+from .group_ahp import GroupAHP, GroupAggregate
 from .profile_matching import ProfileMatching
+from .scenario import ScenarioAnalysis
+from .segmented import SegmentedProfileMatching
+from .sensitivity import SensitivityAnalysis
+from .mcdm import MCDM_METHODS, MCDMMethod, get_method, register_method
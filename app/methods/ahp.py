@@ -1,25 +1,164 @@
-import numpy as np
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class AHP:
     """
     Utility AHP untuk menghitung bobot kriteria + Consistency Ratio (CR)
     dari matriks perbandingan berpasangan.
+
+    Metode bobot:
+      - "normalization": normalisasi kolom lalu rata-rata baris (aproksimasi, default)
+      - "eigenvector": vektor eigen utama (power iteration) - metode eksak Saaty
+      - "geometric": rata-rata geometrik baris (RGMM)
     """
 
+    METHODS = ("normalization", "eigenvector", "geometric")
+
     # Random Index (RI) Saaty untuk n=1..10 (umum dipakai)
     RI_TABLE = {
         1: 0.00, 2: 0.00, 3: 0.58, 4: 0.90, 5: 1.12,
         6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49
     }
 
+    # RI untuk n=11..15: simulate_random_index(n, samples=10000, seed=0)
+    # dibulatkan 2 desimal (1.5099, 1.5355, 1.5562, 1.5693, 1.5826)
+    RI_TABLE_EXTENDED = {
+        11: 1.51, 12: 1.54, 13: 1.56, 14: 1.57, 15: 1.58
+    }
+
+    # RI simulasi untuk n=16..60, dihitung sekali dengan
+    # simulate_random_index(n, samples=10000, seed=0); disimpan di sini agar
+    # request tidak pernah menjalankan simulasi Monte-Carlo.
+    RI_TABLE_SIMULATED = {
+        16: 1.5951, 17: 1.6046, 18: 1.6142, 19: 1.6224, 20: 1.6295,
+        21: 1.6352, 22: 1.6406, 23: 1.6465, 24: 1.6509, 25: 1.6550,
+        26: 1.6590, 27: 1.6629, 28: 1.6666, 29: 1.6697, 30: 1.6720,
+        31: 1.6751, 32: 1.6775, 33: 1.6798, 34: 1.6820, 35: 1.6842,
+        36: 1.6858, 37: 1.6878, 38: 1.6895, 39: 1.6914, 40: 1.6929,
+        41: 1.6948, 42: 1.6959, 43: 1.6977, 44: 1.6989, 45: 1.7001,
+        46: 1.7011, 47: 1.7022, 48: 1.7034, 49: 1.7048, 50: 1.7055,
+        51: 1.7065, 52: 1.7075, 53: 1.7084, 54: 1.7093, 55: 1.7100,
+        56: 1.7108, 57: 1.7118, 58: 1.7126, 59: 1.7131, 60: 1.7138,
+    }
+
+    @staticmethod
+    def random_index(n: int) -> float:
+        """
+        RI untuk ukuran n dari tabel (n <= 15 Saaty, 16..60 simulasi).
+        n > 60 memakai nilai n=60: RI hampir datar di sana (naik < 0.001 per
+        n), dan RI sedikit lebih kecil membuat CR sedikit lebih ketat.
+        """
+        if n in AHP.RI_TABLE:
+            return AHP.RI_TABLE[n]
+        if n in AHP.RI_TABLE_EXTENDED:
+            return AHP.RI_TABLE_EXTENDED[n]
+        return AHP.RI_TABLE_SIMULATED[min(n, max(AHP.RI_TABLE_SIMULATED))]
+
+    @staticmethod
+    def simulate_random_index(n: int, samples: int = 10000, seed: int = 0) -> float:
+        """
+        Rata-rata CI dari `samples` matriks resiprokal acak skala 1/9..9
+        (untuk membangkitkan ulang RI_TABLE_SIMULATED, bukan dipakai per request).
+        """
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        scale = np.array([1/9, 1/8, 1/7, 1/6, 1/5, 1/4, 1/3, 1/2, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+        iu = np.triu_indices(n, 1)
+        lambdas = []
+        for start in range(0, samples, 500):
+            k = min(500, samples - start)
+            A = np.ones((k, n, n))
+            upper = scale[rng.integers(0, scale.size, size=(k, iu[0].size))]
+            A[:, iu[0], iu[1]] = upper
+            A[:, iu[1], iu[0]] = 1.0 / upper
+            lambdas.append(np.linalg.eigvals(A).real.max(axis=1))
+        ci = (np.concatenate(lambdas) - n) / (n - 1)
+        return float(ci.mean())
+
+    @staticmethod
+    def _priority_vectors(A: np.ndarray, method: str, tol: float, max_iter: int) -> np.ndarray:
+        """Bobot untuk tumpukan matriks A (k x n x n) -> (k x n)."""
+        import numpy as np
+        if method == "normalization":
+            col_sum = A.sum(axis=1, keepdims=True)
+            if np.any(col_sum == 0):
+                raise ValueError("Ada kolom dengan jumlah 0. Pastikan semua nilai valid.")
+            w = (A / col_sum).mean(axis=2)
+        elif method == "geometric":
+            if np.any(A <= 0):
+                raise ValueError("Metode geometric membutuhkan semua nilai > 0.")
+            w = np.exp(np.log(A).mean(axis=2))
+        elif method == "eigenvector":
+            # power iteration, mulai dari aproksimasi normalisasi kolom
+            w = (A / A.sum(axis=1, keepdims=True)).mean(axis=2)
+            for _ in range(max_iter):
+                nxt = np.einsum("kij,kj->ki", A, w)
+                nxt /= nxt.sum(axis=1, keepdims=True)
+                if np.max(np.abs(nxt - w)) < tol:
+                    w = nxt
+                    break
+                w = nxt
+            else:
+                raise ValueError(
+                    f"Metode eigenvector tidak konvergen dalam {max_iter} iterasi; "
+                    "periksa matriks atau gunakan metode normalization/geometric."
+                )
+        else:
+            raise ValueError(f"Metode tidak dikenal: {method}. Pilih salah satu dari {AHP.METHODS}.")
+        return w / w.sum(axis=1, keepdims=True)
+
+    @staticmethod
+    def calculate_weights_batch(matrices: np.ndarray, method: str = "normalization",
+                                tol: float = 1e-10, max_iter: int = 1000):
+        """
+        Hitung bobot dan CR untuk tumpukan matriks pairwise (k x n x n) sekaligus.
+        Return:
+          weights: np.ndarray (k x n), tiap baris jumlah = 1
+          cr: np.ndarray (k,)
+        """
+        import numpy as np
+        if matrices is None:
+            raise ValueError("Matrix is None")
+
+        A = np.array(matrices, dtype=float)
+        if A.ndim != 3 or A.shape[1] != A.shape[2]:
+            raise ValueError("Input harus berbentuk (k, n, n).")
+        k, n = A.shape[0], A.shape[1]
+
+        if n < 2:
+            # tidak bisa AHP, tapi kembalikan bobot trivial
+            return np.ones((k, n)), np.zeros(k)
+
+        weights = AHP._priority_vectors(A, method, tol, max_iter)
+
+        # Hitung lambda_max
+        Aw = np.einsum("kij,kj->ki", A, weights)
+        lambda_max = np.mean(Aw / weights, axis=1)
+
+        # Consistency Index (CI)
+        ci = (lambda_max - n) / (n - 1)
+
+        # Consistency Ratio (CR)
+        ri = AHP.random_index(n)
+        cr = np.zeros(k) if ri == 0 else ci / ri
+
+        return weights, cr
+
     @staticmethod
-    def calculate_weights(matrix: np.ndarray):
+    def calculate_weights(matrix: np.ndarray, method: str = "normalization",
+                          tol: float = 1e-10, max_iter: int = 1000):
         """
         Hitung bobot dan CR dari matriks pairwise (n x n).
         Return:
           weights: list[float] panjang n (jumlah = 1)
           cr: float
         """
+        import numpy as np
         if matrix is None:
             raise ValueError("Matrix is None")
 
@@ -33,26 +172,5 @@ class AHP:
             # tidak bisa AHP, tapi kembalikan bobot trivial
             return [1.0], 0.0
 
-        # Normalisasi kolom
-        col_sum = A.sum(axis=0)
-        if np.any(col_sum == 0):
-            raise ValueError("Ada kolom dengan jumlah 0. Pastikan semua nilai valid.")
-
-        norm = A / col_sum
-
-        # Priority vector (rata-rata baris)
-        weights = norm.mean(axis=1)
-        weights = weights / weights.sum()
-
-        # Hitung lambda_max
-        Aw = A.dot(weights)
-        lambda_max = float(np.mean(Aw / weights))
-
-        # Consistency Index (CI)
-        ci = (lambda_max - n) / (n - 1)
-
-        # Consistency Ratio (CR)
-        ri = AHP.RI_TABLE.get(n, 1.49)  # fallback
-        cr = 0.0 if ri == 0 else float(ci / ri)
-
-        return weights.tolist(), cr
+        weights, cr = AHP.calculate_weights_batch(A[None], method=method, tol=tol, max_iter=max_iter)
+        return weights[0].tolist(), float(cr[0])
@@ -0,0 +1,229 @@
+"""
+methods/group_ahp.py - Group AHP: agregasi penilaian pairwise banyak penilai (AIJ / AIP)
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict
+
+from .ahp import AHP
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class GroupAHP:
+    """
+    Agregasi tumpukan matriks pairwise R penilai (R x n x n):
+      - "aij" (aggregation of individual judgments): rata-rata geometrik
+        berbobot per elemen -> satu matriks kelompok (tetap resiprokal) ->
+        AHP.calculate_weights
+      - "aip" (aggregation of individual priorities): rata-rata geometrik
+        berbobot dari bobot tiap penilai, dinormalisasi
+    """
+
+    MODES = ("aij", "aip")
+
+    @staticmethod
+    def rater_weights(r: int, weights=None) -> np.ndarray:
+        """Bobot penilai (default semua 1); harus >= 0 dengan jumlah > 0."""
+        import numpy as np
+        if weights is None:
+            return np.ones(r)
+        w = np.asarray(weights, dtype=float)
+        if w.shape != (r,) or np.any(w < 0) or (r and w.sum() <= 0):
+            raise ValueError("Bobot penilai harus >= 0 dan jumlahnya > 0.")
+        return w
+
+    @staticmethod
+    def aggregate_judgments(log_matrices: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """exp(Σ_r w_r log A_r / Σ_r w_r) untuk log-matriks (R x n x n)."""
+        import numpy as np
+        return np.exp(np.tensordot(weights, log_matrices, axes=1) / weights.sum())
+
+    @staticmethod
+    def aggregate_priorities(priorities: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Rata-rata geometrik berbobot bobot penilai (R x n), dinormalisasi."""
+        import numpy as np
+        g = np.exp(weights @ np.log(priorities) / weights.sum())
+        return g / g.sum()
+
+    @staticmethod
+    def calculate(matrices: np.ndarray, weights=None, mode: str = "aij", method: str = "normalization") -> Dict:
+        """
+        Bobot + CR tiap penilai dan matriks kelompok dihitung dalam satu pass
+        AHP.calculate_weights_batch atas tumpukan (R + 1) x n x n.
+
+        Returns:
+            dict berisi weights (n,) bobot kelompok, cr (CR matriks kelompok),
+            matrix (n x n) matriks kelompok, rater_weights (R x n), rater_cr (R,)
+        """
+        import numpy as np
+        if mode not in GroupAHP.MODES:
+            raise ValueError(f"Mode agregasi harus salah satu dari {GroupAHP.MODES}.")
+        A = np.asarray(matrices, dtype=float)
+        if A.ndim != 3 or A.shape[1] != A.shape[2] or A.shape[0] == 0:
+            raise ValueError("Input harus berbentuk (R, n, n) dengan R >= 1.")
+        if np.any(A <= 0):
+            raise ValueError("Nilai AHP harus > 0.")
+        w = GroupAHP.rater_weights(A.shape[0], weights)
+
+        group = GroupAHP.aggregate_judgments(np.log(A), w)
+        priorities, cr = AHP.calculate_weights_batch(np.concatenate([A, group[None]]), method=method)
+        result = priorities[-1] if mode == "aij" else GroupAHP.aggregate_priorities(priorities[:-1], w)
+        return {
+            "mode": mode,
+            "weights": result,
+            "cr": float(cr[-1]),
+            "matrix": group,
+            "rater_weights": priorities[:-1],
+            "rater_cr": cr[:-1],
+        }
+
+
+class GroupAggregate:
+    """
+    State agregasi inkremental untuk kriteria `crit_ids` (urut id):
+    log-matriks, bobot dan CR tiap penilai, plus jumlah berbobot
+    Σ w log A dan Σ w log p. upsert()/remove() satu penilai hanya
+    menghitung matriks penilai itu dan mengoreksi jumlahnya.
+    """
+
+    def __init__(self, crit_ids, method: str, rater_ids=None, rater_weight=None, log_matrices=None):
+        import numpy as np
+        n = len(crit_ids)
+        self.crit_ids = np.asarray(crit_ids, dtype=np.int64)
+        self.method = method
+        self.rater_ids = np.asarray([] if rater_ids is None else rater_ids, dtype=np.int64)
+        r = self.rater_ids.size
+        self.rater_weight = GroupAHP.rater_weights(r, rater_weight).copy() if r else np.empty(0)
+        self.log_matrices = np.empty((0, n, n)) if log_matrices is None else np.asarray(log_matrices, dtype=float)
+        if r:
+            self.priorities, self.cr = AHP.calculate_weights_batch(np.exp(self.log_matrices), method=method)
+        else:
+            self.priorities, self.cr = np.empty((0, n)), np.empty(0)
+        self._resum()
+
+    def _resum(self):
+        import numpy as np
+        self.weight_total = float(self.rater_weight.sum())
+        self.log_judgment_sum = np.tensordot(self.rater_weight, self.log_matrices, axes=1)
+        self.log_priority_sum = self.rater_weight @ np.log(self.priorities) if self.rater_ids.size else np.zeros(len(self.crit_ids))
+
+    def state(self) -> dict:
+        """Semua array state (untuk disimpan); lihat from_state()."""
+        return dict(vars(self))
+
+    @classmethod
+    def from_state(cls, state: dict) -> "GroupAggregate":
+        agg = cls.__new__(cls)
+        agg.__dict__.update(state)
+        return agg
+
+    def __len__(self):
+        return int(self.rater_ids.size)
+
+    def with_method(self, method: str) -> "GroupAggregate":
+        """State yang sama dengan metode bobot lain (bobot + CR penilai dihitung ulang)."""
+        if method == self.method:
+            return self
+        return GroupAggregate(self.crit_ids, method, self.rater_ids, self.rater_weight, self.log_matrices)
+
+    def _position(self, rater_id: int):
+        import numpy as np
+        k = int(np.searchsorted(self.rater_ids, rater_id))
+        return k, k < self.rater_ids.size and self.rater_ids[k] == rater_id
+
+    def upsert(self, rater_id: int, matrix: np.ndarray, weight: float = 1.0):
+        """Tambah / ganti matriks satu penilai; return (bobot penilai (n,), CR)."""
+        import numpy as np
+        if weight < 0:
+            raise ValueError("Bobot penilai harus >= 0.")
+        log_a = np.log(np.asarray(matrix, dtype=float))
+        priorities, cr = AHP.calculate_weights_batch(np.exp(log_a)[None], method=self.method)
+        k, exists = self._position(rater_id)
+        if exists:
+            self._subtract(k)
+            self.rater_weight[k] = weight
+            self.log_matrices[k] = log_a
+            self.priorities[k], self.cr[k] = priorities[0], cr[0]
+        else:
+            self.rater_ids = np.insert(self.rater_ids, k, rater_id)
+            self.rater_weight = np.insert(self.rater_weight, k, weight)
+            self.log_matrices = np.insert(self.log_matrices, k, log_a, axis=0)
+            self.priorities = np.insert(self.priorities, k, priorities[0], axis=0)
+            self.cr = np.insert(self.cr, k, cr[0])
+        self.weight_total += weight
+        self.log_judgment_sum += weight * log_a
+        self.log_priority_sum += weight * np.log(priorities[0])
+        return priorities[0], float(cr[0])
+
+    def _subtract(self, k: int):
+        import numpy as np
+        w = self.rater_weight[k]
+        self.weight_total -= w
+        self.log_judgment_sum -= w * self.log_matrices[k]
+        self.log_priority_sum -= w * np.log(self.priorities[k])
+
+    def remove(self, rater_id: int) -> bool:
+        import numpy as np
+        k, exists = self._position(rater_id)
+        if not exists:
+            return False
+        self._subtract(k)
+        keep = np.arange(self.rater_ids.size) != k
+        self.rater_ids = self.rater_ids[keep]
+        self.rater_weight = self.rater_weight[keep]
+        self.log_matrices = self.log_matrices[keep]
+        self.priorities = self.priorities[keep]
+        self.cr = self.cr[keep]
+        if not self.rater_ids.size:
+            self._resum()
+        return True
+
+    def aggregate(self, mode: str = "aij", max_cr: float = None) -> Dict:
+        """
+        Bobot kelompok. Tanpa max_cr dipakai jumlah berjalan (O(n^2));
+        dengan max_cr hanya penilai ber-CR <= max_cr yang ikut.
+        """
+        import numpy as np
+        if mode not in GroupAHP.MODES:
+            raise ValueError(f"Mode agregasi harus salah satu dari {GroupAHP.MODES}.")
+        if max_cr is None:
+            mask = np.ones(self.rater_ids.size, dtype=bool)
+            total, log_judgments, log_priorities = self.weight_total, self.log_judgment_sum, self.log_priority_sum
+        else:
+            mask = self.cr <= max_cr
+            w = np.where(mask, self.rater_weight, 0.0)
+            total = float(w.sum())
+            log_judgments = np.tensordot(w, self.log_matrices, axes=1)
+            log_priorities = w @ np.log(self.priorities) if self.rater_ids.size else None
+        if not mask.any() or total <= 0:
+            raise ValueError("Belum ada penilai (yang memenuhi syarat) untuk diagregasi.")
+
+        matrix = np.exp(log_judgments / total)
+        # jumlah berjalan bisa bergeser sedikit; paksa resiprokal & diagonal 1
+        iu = np.triu_indices(len(self.crit_ids), 1)
+        matrix[iu[1], iu[0]] = 1.0 / matrix[iu]
+        np.fill_diagonal(matrix, 1.0)
+        weights, cr = AHP.calculate_weights(matrix, method=self.method)
+        if mode == "aip":
+            g = np.exp(log_priorities / total)
+            weights = (g / g.sum()).tolist()
+        return {
+            "mode": mode,
+            "method": self.method,
+            "weights": dict(zip(self.crit_ids.tolist(), weights)),
+            "cr": cr,
+            "matrix": matrix,
+            "raters": int(mask.sum()),
+            "excluded": self.rater_ids[~mask].tolist(),
+        }
+
+    def rater_results(self) -> Dict[int, dict]:
+        """{rater_id: {"weights": {crit_id: w}, "cr": cr, "weight": bobot penilai}}"""
+        crit = self.crit_ids.tolist()
+        return {
+            int(rid): {"weights": dict(zip(crit, p.tolist())), "cr": float(c), "weight": float(w)}
+            for rid, p, c, w in zip(self.rater_ids, self.priorities, self.cr, self.rater_weight)
+        }
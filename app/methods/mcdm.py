@@ -0,0 +1,145 @@
+"""
+methods/mcdm.py - Registry of MCDM scoring engines (Profile Matching, SAW, TOPSIS, WP)
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict
+
+from .profile_matching import ProfileMatching
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MCDM_METHODS = {}
+
+
+def register_method(cls):
+    """Daftarkan engine MCDM berdasarkan atribut `key`-nya."""
+    MCDM_METHODS[cls.key] = cls
+    return cls
+
+
+def get_method(key: str):
+    try:
+        return MCDM_METHODS[key]
+    except KeyError:
+        raise ValueError(f"Metode harus salah satu dari {tuple(MCDM_METHODS)}") from None
+
+
+def ranks_from_scores(scores: np.ndarray) -> np.ndarray:
+    """Peringkat 1-based (skor tertinggi = 1, seri -> urutan indeks) via inverse permutation."""
+    import numpy as np
+    order = np.argsort(-scores, kind="stable")
+    ranks = np.empty(scores.size, dtype=np.int64)
+    ranks[order] = np.arange(1, scores.size + 1)
+    return ranks
+
+
+class MCDMMethod:
+    """
+    Antarmuka bersama: matriks keputusan (m x n), bobot (n,) dan tipe
+    kriteria (is_benefit, bool (n,)) -> skor (m,), makin besar makin baik.
+    """
+
+    key = None
+    label = None
+    formula = None
+
+    @staticmethod
+    def scores(values: np.ndarray, weights: np.ndarray, is_benefit: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    @classmethod
+    def scores_for(cls, matrix, weights: np.ndarray) -> np.ndarray:
+        """Skor dari objek DecisionMatrix (engine boleh memakai hasil yang sudah dihitung di matrix)."""
+        return cls.scores(matrix.values, weights, matrix.is_benefit)
+
+    @classmethod
+    def calculate(cls, values: np.ndarray, weights: np.ndarray, is_benefit: np.ndarray) -> Dict:
+        import numpy as np
+        values = np.asarray(values, dtype=float)
+        weights = np.asarray(weights, dtype=float)
+        is_benefit = np.asarray(is_benefit, dtype=bool)
+        if values.ndim != 2 or values.shape[1] != weights.size or weights.size != is_benefit.size:
+            raise ValueError("Ukuran matriks, bobot dan tipe kriteria tidak cocok.")
+        scores = cls.scores(values, weights, is_benefit)
+        return {"method": cls.key, "scores": scores, "ranks": ranks_from_scores(scores)}
+
+
+def _safe_divide(a, b):
+    """a / b dengan hasil 0 di sel yang penyebutnya 0."""
+    import numpy as np
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    return np.divide(a, b, out=np.zeros(a.shape), where=b != 0)
+
+
+@register_method
+class ProfileMatchingMethod(MCDMMethod):
+    key = "profile_matching"
+    label = "Profile Matching"
+    formula = "Σ w_j / (1 + |x_ij - ideal_j|), ideal: benefit = maks, cost = min"
+
+    @classmethod
+    def scores_for(cls, matrix, weights):
+        # gap score sudah tersimpan di store matriks; tidak dihitung ulang
+        return matrix.gap_scores() @ weights
+
+    @staticmethod
+    def scores(values, weights, is_benefit):
+        ideal = ProfileMatching.ideal_profile(values, is_benefit)
+        return ProfileMatching.gap_scores(values, ideal) @ weights
+
+
+@register_method
+class SAW(MCDMMethod):
+    key = "saw"
+    label = "SAW (Simple Additive Weighting)"
+    formula = "Σ w_j r_ij, r = x / maks (benefit) atau min / x (cost)"
+
+    @staticmethod
+    def scores(values, weights, is_benefit):
+        import numpy as np
+        r = np.where(
+            is_benefit,
+            _safe_divide(values, values.max(axis=0)),
+            _safe_divide(values.min(axis=0), values),
+        )
+        return r @ weights
+
+
+@register_method
+class TOPSIS(MCDMMethod):
+    key = "topsis"
+    label = "TOPSIS"
+    formula = "D⁻ / (D⁺ + D⁻) terhadap solusi ideal positif/negatif (normalisasi vektor)"
+
+    @staticmethod
+    def scores(values, weights, is_benefit):
+        import numpy as np
+        v = _safe_divide(values, np.sqrt((values ** 2).sum(axis=0))) * weights
+        vmax, vmin = v.max(axis=0), v.min(axis=0)
+        best = np.where(is_benefit, vmax, vmin)
+        worst = np.where(is_benefit, vmin, vmax)
+        d_best = np.sqrt(((v - best) ** 2).sum(axis=1))
+        d_worst = np.sqrt(((v - worst) ** 2).sum(axis=1))
+        return _safe_divide(d_worst, d_best + d_worst)
+
+
+@register_method
+class WeightedProduct(MCDMMethod):
+    key = "wp"
+    label = "WP (Weighted Product)"
+    formula = "S_i = Π x_ij^(±w_j), V_i = S_i / Σ S (pangkat negatif untuk cost)"
+
+    @staticmethod
+    def scores(values, weights, is_benefit):
+        import numpy as np
+        if (values <= 0).any():
+            raise ValueError("Weighted Product membutuhkan semua nilai alternatif > 0.")
+        total = weights.sum()
+        exponents = np.where(is_benefit, 1.0, -1.0) * (weights / total if total > 0 else weights)
+        # produk pangkat dalam ruang log: exp(log(x) @ w), dikurangi maks agar tidak overflow
+        log_s = np.log(values) @ exponents
+        s = np.exp(log_s - log_s.max())
+        return s / s.sum()
@@ -2,21 +2,40 @@
 methods/profile_matching.py - Profile Matching Method
 """
 
-import numpy as np
-from typing import Dict, List
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List
 import logging
 
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
 class ProfileMatching:
     """Profile Matching Method Implementation"""
     
+    DETAIL_LEVELS = ("summary", "full")
+
+    @staticmethod
+    def ideal_profile(decision_matrix: np.ndarray, is_benefit: np.ndarray) -> np.ndarray:
+        """Ideal profile: benefit -> column maximum, cost -> column minimum."""
+        import numpy as np
+        return np.where(is_benefit, decision_matrix.max(axis=0), decision_matrix.min(axis=0))
+
+    @staticmethod
+    def gap_scores(decision_matrix: np.ndarray, ideal_profile: np.ndarray) -> np.ndarray:
+        """Per-cell gap score 1 / (1 + |value - ideal|), MxN."""
+        import numpy as np
+        return 1.0 / (1.0 + np.abs(decision_matrix - ideal_profile))
+
     @staticmethod
     def calculate(decision_matrix: np.ndarray,
                  weights: np.ndarray,
                  alternatives: List[str],
-                 ideal_profile: np.ndarray) -> Dict:
+                 ideal_profile: np.ndarray,
+                 detail: str = "summary") -> Dict:
         """
         Profile Matching Method:
         Compares each alternative against an ideal profile
@@ -31,26 +50,29 @@ class ProfileMatching:
             weights: Weight vector
             alternatives: Alternative names
             ideal_profile: Ideal values for each criterion
+            detail: 'summary' (scores + rankings only, memory O(M)) or
+                    'full' (adds gaps, weighted_gaps and calculation_steps, O(MxN))
             
         Returns:
             Results dictionary
         """
+        import numpy as np
+        if detail not in ProfileMatching.DETAIL_LEVELS:
+            raise ValueError(f"detail harus salah satu dari {ProfileMatching.DETAIL_LEVELS}")
+
+        decision_matrix = np.asarray(decision_matrix, dtype=float)
+        ideal_profile = np.asarray(ideal_profile, dtype=float)
+        weights = np.asarray(weights, dtype=float)
         m, n = decision_matrix.shape
-        decision_matrix = decision_matrix.astype(float)
-        ideal_profile = ideal_profile.astype(float)
-        
-        # Step 1: Calculate gaps (differences from ideal)
-        gaps = np.zeros((m, n))
-        weighted_gaps = np.zeros((m, n))
+        full = detail == "full"
         
-        for i in range(m):
-            for j in range(n):
-                gap = abs(decision_matrix[i, j] - ideal_profile[j])
-                gaps[i, j] = gap
-                weighted_gaps[i, j] = weights[j] * gap
-        
-        # Step 2: Calculate total weighted gap
-        total_gaps = np.sum(weighted_gaps, axis=1)
+        # Step 1-2: gaps (differences from ideal) and total weighted gap, via broadcasting
+        gaps = np.abs(decision_matrix - ideal_profile)
+        if full:
+            weighted_gaps = gaps * weights
+            total_gaps = weighted_gaps.sum(axis=1)
+        else:
+            total_gaps = gaps @ weights
         
         # Step 3: Convert gap to similarity score (lower gap = higher score)
         # Normalize gaps to 0-100 scale (100 = perfect match, 0 = worst match)
@@ -62,41 +84,45 @@ class ProfileMatching:
         
         # Step 4: Rank by similarity (highest score = best)
         rankings = np.argsort(similarity_scores)[::-1]
+        # inverse permutation: rank_of[i] = peringkat (1-based) alternatif i
+        rank_of = np.empty(m, dtype=np.int64)
+        rank_of[rankings] = np.arange(1, m + 1)
         
         results = {
             'method': 'Profile Matching',
-            'ideal_profile': [float(p) for p in ideal_profile],
-            'gaps': gaps.tolist(),
-            'weighted_gaps': weighted_gaps.tolist(),
-            'total_gaps': [float(g) for g in total_gaps],
-            'similarity_scores': [float(s) for s in similarity_scores],
-            'scores': [float(s) for s in similarity_scores],
-            'rankings': [int(r+1) for r in rankings],
-            'alternative_rankings': {alternatives[r]: int(i+1) for i, r in enumerate(rankings)},
+            'ideal_profile': ideal_profile.tolist(),
+            'total_gaps': total_gaps.tolist(),
+            'similarity_scores': similarity_scores.tolist(),
+            'scores': similarity_scores.tolist(),
+            'rankings': (rankings + 1).tolist(),
+            'alternative_rankings': {alternatives[r]: i + 1 for i, r in enumerate(rankings.tolist())},
             'best_alternative': alternatives[rankings[0]],
             'best_score': float(similarity_scores[rankings[0]]),
             'worst_alternative': alternatives[rankings[-1]],
             'worst_score': float(similarity_scores[rankings[-1]]),
-            'calculation_steps': {
-                'gap_formula': '|Alternative_value - Ideal_value|',
-                'weighted_gap_formula': 'w_j × gap_ij',
-                'total_gap_formula': 'Σ(weighted_gaps)',
-                'similarity_formula': '100 × (1 - total_gap / max_gap)',
-                'detailed_calculations': []
-            }
         }
+        if not full:
+            return results
         
-        # Detailed steps
-        for i in range(m):
-            calc = {
-                'alternative': alternatives[i],
-                'gaps': [float(g) for g in gaps[i]],
-                'weighted_gaps': [float(wg) for wg in weighted_gaps[i]],
-                'total_gap': float(total_gaps[i]),
-                'similarity_score': float(similarity_scores[i]),
-                'ranking': int(np.where(rankings == i)[0][0] + 1)
-            }
-            results['calculation_steps']['detailed_calculations'].append(calc)
+        results['gaps'] = gaps.tolist()
+        results['weighted_gaps'] = weighted_gaps.tolist()
+        results['calculation_steps'] = {
+            'gap_formula': '|Alternative_value - Ideal_value|',
+            'weighted_gap_formula': 'w_j × gap_ij',
+            'total_gap_formula': 'Σ(weighted_gaps)',
+            'similarity_formula': '100 × (1 - total_gap / max_gap)',
+            'detailed_calculations': [
+                {
+                    'alternative': alternatives[i],
+                    'gaps': results['gaps'][i],
+                    'weighted_gaps': results['weighted_gaps'][i],
+                    'total_gap': results['total_gaps'][i],
+                    'similarity_score': results['similarity_scores'][i],
+                    'ranking': int(rank_of[i]),
+                }
+                for i in range(m)
+            ],
+        }
         
         return results
 
@@ -104,7 +130,8 @@ class ProfileMatching:
 def calculate_profile_matching(decision_matrix: np.ndarray,
                               weights: np.ndarray,
                               alternatives: List[str],
-                              ideal_profile: np.ndarray) -> Dict:
+                              ideal_profile: np.ndarray,
+                              detail: str = "summary") -> Dict:
     """Calculate Profile Matching method"""
-    return ProfileMatching.calculate(decision_matrix, weights, alternatives, ideal_profile)
+    return ProfileMatching.calculate(decision_matrix, weights, alternatives, ideal_profile, detail)
 
@@ -0,0 +1,121 @@
+"""
+methods/scenario.py - Batch scenario ranking (many weight vectors in one pass)
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def rank_columns(scores: np.ndarray) -> np.ndarray:
+    """
+    Peringkat (1-based) per kolom dari matriks skor (m x K), skor tertinggi = 1.
+    Memakai argsort per kolom + inverse permutation.
+    """
+    import numpy as np
+    m = scores.shape[0]
+    order = np.argsort(-scores, axis=0, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, m + 1)[:, None], axis=0)
+    return ranks
+
+
+def top_k_columns(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indeks K skor tertinggi per kolom (K x cols), terurut, via argpartition."""
+    import numpy as np
+    m = scores.shape[0]
+    k = min(k, m)
+    if k <= 0:
+        return np.empty((0, scores.shape[1]), dtype=np.int64)
+    part = np.argpartition(-scores, k - 1, axis=0)[:k] if k < m else np.tile(np.arange(m)[:, None], (1, scores.shape[1]))
+    part_scores = np.take_along_axis(scores, part, axis=0)
+    return np.take_along_axis(part, np.argsort(-part_scores, axis=0, kind="stable"), axis=0)
+
+
+class ScenarioAnalysis:
+    """Ranking alternatif di bawah K vektor bobot sekaligus"""
+
+    @staticmethod
+    def calculate(score_matrix: np.ndarray,
+                  weight_matrix: np.ndarray,
+                  alternatives: List[str],
+                  labels: List[str] = None,
+                  top_k: int = 10,
+                  baseline: int = 0) -> Dict:
+        """
+        Formula:
+        1. scores = S · Wᵀ  (m x n) · (n x K) -> (m x K), satu perkalian matriks
+        2. ranks per kolom via inverse permutation
+        3. delta = rank_baseline - rank_scenario (positif = naik peringkat)
+
+        Args:
+            score_matrix: MxN gap-score matrix (sama dengan yang dipakai /results)
+            weight_matrix: KxN, satu baris per skenario (dinormalisasi ke jumlah 1)
+            alternatives: Alternative names
+            labels: nama skenario (default 'S1'..'SK')
+            top_k: panjang daftar teratas per skenario
+            baseline: indeks skenario pembanding untuk delta
+
+        Returns:
+            Results dictionary
+        """
+        import numpy as np
+        S = np.asarray(score_matrix, dtype=float)
+        W = np.atleast_2d(np.asarray(weight_matrix, dtype=float))
+        m, n = S.shape
+        K = W.shape[0]
+        if W.shape[1] != n:
+            raise ValueError(f"Vektor bobot harus berisi {n} nilai (satu per kriteria).")
+        if np.any(W < 0) or np.any(W.sum(axis=1) <= 0):
+            raise ValueError("Bobot harus non-negatif dan tidak boleh semuanya 0.")
+        if not 0 <= baseline < K:
+            raise ValueError("Indeks baseline di luar jumlah skenario.")
+        labels = list(labels) if labels else [f"S{k + 1}" for k in range(K)]
+        if len(labels) != K:
+            raise ValueError(f"Jumlah label ({len(labels)}) harus sama dengan jumlah skenario ({K}).")
+
+        W = W / W.sum(axis=1, keepdims=True)
+        scores = S @ W.T
+        ranks = rank_columns(scores)
+        deltas = ranks[:, [baseline]] - ranks
+        top = top_k_columns(scores, top_k)
+        movers = top_k_columns(np.abs(deltas).astype(float), top_k)
+
+        scenarios = []
+        for k in range(K):
+            scenarios.append({
+                'label': labels[k],
+                'weights': W[k].tolist(),
+                'top': [
+                    {
+                        'index': int(i),
+                        'alternative': alternatives[i],
+                        'score': float(scores[i, k]),
+                        'rank': int(ranks[i, k]),
+                        'delta': int(deltas[i, k]),
+                    }
+                    for i in top[:, k]
+                ],
+                'movers': [
+                    {
+                        'index': int(i),
+                        'alternative': alternatives[i],
+                        'rank': int(ranks[i, k]),
+                        'baseline_rank': int(ranks[i, baseline]),
+                        'delta': int(deltas[i, k]),
+                    }
+                    for i in movers[:, k] if deltas[i, k] != 0
+                ],
+                'changed': int(np.count_nonzero(deltas[:, k])),
+            })
+
+        return {
+            'method': 'Scenario Analysis',
+            'baseline': labels[baseline],
+            'alternatives': m,
+            'criteria': n,
+            'scenarios': scenarios,
+        }
@@ -0,0 +1,161 @@
+"""
+methods/sensitivity.py - Monte Carlo weight-sensitivity analysis
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, List
+
+from .scenario import rank_columns
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def sample_weights(rng: np.random.Generator, weights: np.ndarray, size: int,
+                   mode: str = "dirichlet", concentration: float = 100.0,
+                   jitter: float = 0.1) -> np.ndarray:
+    """
+    Sampel bobot di sekitar `weights` (size x n), setiap baris berjumlah 1.
+
+    - dirichlet: Dirichlet(concentration * w); makin besar concentration makin sempit
+    - jitter: w_j * (1 + U(-jitter, +jitter)), lalu dinormalisasi
+    """
+    import numpy as np
+    w = np.asarray(weights, dtype=float)
+    if mode == "dirichlet":
+        alpha = np.maximum(w * concentration, 1e-6)
+        return rng.dirichlet(alpha, size=size)
+    if mode == "jitter":
+        W = w * (1.0 + rng.uniform(-jitter, jitter, size=(size, w.size)))
+        return W / W.sum(axis=1, keepdims=True)
+    raise ValueError("mode harus 'dirichlet' atau 'jitter'")
+
+
+def _accumulate(score_matrix, weights, chunks, mode, concentration, jitter, top_k, n_bins):
+    """
+    Proses daftar chunk (jumlah sampel, seed chunk); memori hanya O(m x chunk).
+    Setiap chunk punya RNG sendiri, jadi hasil tidak bergantung pada cara
+    chunk dibagi ke worker.
+    Return akumulator (hist, top_count, rank_sum, rank_min, rank_max).
+    """
+    import numpy as np
+    S = np.asarray(score_matrix, dtype=float)
+    m = S.shape[0]
+    hist = np.zeros(m * n_bins, dtype=np.int64)
+    top_count = np.zeros(m, dtype=np.int64)
+    rank_sum = np.zeros(m, dtype=np.float64)
+    rank_min = np.full(m, m + 1, dtype=np.int64)
+    rank_max = np.zeros(m, dtype=np.int64)
+    row_offset = (np.arange(m) * n_bins)[:, None]
+
+    for size, seed in chunks:
+        W = sample_weights(np.random.default_rng(seed), weights, size, mode, concentration, jitter)
+        ranks = rank_columns(S @ W.T)  # (m x size)
+
+        bins = (ranks - 1) * n_bins // m
+        hist += np.bincount((row_offset + bins).ravel(), minlength=m * n_bins)
+        top_count += (ranks <= top_k).sum(axis=1)
+        rank_sum += ranks.sum(axis=1)
+        np.minimum(rank_min, ranks.min(axis=1), out=rank_min)
+        np.maximum(rank_max, ranks.max(axis=1), out=rank_max)
+
+    return hist.reshape(m, n_bins), top_count, rank_sum, rank_min, rank_max
+
+
+class SensitivityAnalysis:
+    """Stabilitas ranking terhadap gangguan bobot AHP (Monte Carlo)"""
+
+    # batas sel (m x chunk) per chunk agar memori tetap, berapapun jumlah sampel
+    CHUNK_CELLS = 2_000_000
+
+    @staticmethod
+    def calculate(score_matrix: np.ndarray,
+                  weights: np.ndarray,
+                  alternatives: List[str],
+                  samples: int = 5000,
+                  mode: str = "dirichlet",
+                  concentration: float = 100.0,
+                  jitter: float = 0.1,
+                  top_k: int = 10,
+                  n_bins: int = 10,
+                  seed: int = 0,
+                  workers: int = 0) -> Dict:
+        """
+        Args:
+            score_matrix: MxN gap-score matrix
+            weights: bobot AHP dasar (N)
+            alternatives: Alternative names
+            samples: jumlah sampel bobot
+            mode: 'dirichlet' atau 'jitter'
+            concentration / jitter: parameter gangguan
+            top_k: ambang "masuk K besar"
+            n_bins: jumlah bin histogram peringkat (peringkat 1..M dibagi rata)
+            seed: seed RNG (hasil deterministik untuk seed yang sama)
+            workers: >1 untuk membagi chunk sampel ke process pool (tidak mengubah hasil)
+
+        Returns:
+            Results dictionary
+        """
+        import numpy as np
+        S = np.asarray(score_matrix, dtype=float)
+        w = np.asarray(weights, dtype=float)
+        m, n = S.shape
+        if w.shape != (n,):
+            raise ValueError(f"Bobot harus berisi {n} nilai.")
+        if samples < 1:
+            raise ValueError("Jumlah sampel minimal 1.")
+        n_bins = max(1, min(n_bins, m))
+        top_k = max(1, min(top_k, m))
+        chunk_size = max(1, SensitivityAnalysis.CHUNK_CELLS // m)
+        w = w / w.sum()
+
+        # seed per chunk (bukan per worker): hasil sama untuk berapapun workers
+        sizes = [min(chunk_size, samples - lo) for lo in range(0, samples, chunk_size)]
+        chunks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+        if workers and workers > 1 and len(chunks) > 1:
+            groups = [g for g in np.array_split(np.arange(len(chunks)), min(workers, len(chunks))) if g.size]
+            with ProcessPoolExecutor(max_workers=len(groups)) as pool:
+                parts = list(pool.map(
+                    _accumulate,
+                    *zip(*[(S, w, [chunks[i] for i in g], mode, concentration, jitter, top_k, n_bins)
+                           for g in groups])
+                ))
+            hist = sum(p[0] for p in parts)
+            top_count = sum(p[1] for p in parts)
+            rank_sum = sum(p[2] for p in parts)
+            rank_min = np.min([p[3] for p in parts], axis=0)
+            rank_max = np.max([p[4] for p in parts], axis=0)
+        else:
+            hist, top_count, rank_sum, rank_min, rank_max = _accumulate(
+                S, w, chunks, mode, concentration, jitter, top_k, n_bins
+            )
+
+        base_rank = rank_columns((S @ w)[:, None])[:, 0]
+        # bin b memuat peringkat r dengan (r - 1) * n_bins // m == b
+        starts = -(-(np.arange(n_bins) * m) // n_bins) + 1
+        ends = np.append(starts[1:] - 1, m)
+        order = np.argsort(base_rank)
+
+        return {
+            'method': 'Monte Carlo Sensitivity',
+            'mode': mode,
+            'samples': int(samples),
+            'top_k': int(top_k),
+            'rank_bins': [[int(a), int(b)] for a, b in zip(starts, ends)],
+            'alternatives': [
+                {
+                    'index': int(i),
+                    'alternative': alternatives[i],
+                    'base_rank': int(base_rank[i]),
+                    'mean_rank': float(rank_sum[i] / samples),
+                    'min_rank': int(rank_min[i]),
+                    'max_rank': int(rank_max[i]),
+                    'p_top_k': float(top_count[i] / samples),
+                    'rank_histogram': (hist[i] / samples).tolist(),
+                }
+                for i in order
+            ],
+        }
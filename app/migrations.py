@@ -0,0 +1,118 @@
+"""
+migrations.py - Upgrade skema untuk database yang sudah ada
+
+db.create_all() hanya membuat tabel yang belum ada; indeks baru pada tabel
+lama tidak ikut dibuat. Versi skema disimpan di PRAGMA user_version dan
+setiap langkah di MIGRATIONS dijalankan sekali, berurutan. Semua langkah
+idempoten sehingga aman juga untuk database baru.
+
+Setiap perubahan models (tabel/kolom/indeks baru) wajib menambah satu
+langkah: ensure_schema() melewati create_all() bila user_version sudah
+sama dengan SCHEMA_VERSION. Langkah hanya membuat indeks yang ia tambahkan
+(disebut namanya), karena database lama bisa belum punya kolom untuk indeks
+langkah berikutnya.
+"""
+
+import logging
+
+from sqlalchemy import text
+
+from . import db
+
+logger = logging.getLogger(__name__)
+
+
+def _create_indexes(conn, *names):
+    """Buat indeks `names` (seperti dideklarasikan di models) bila belum ada di database."""
+    indexes = {index.name: index for table in db.metadata.sorted_tables for index in table.indexes}
+    for name in names:
+        indexes[name].create(bind=conn, checkfirst=True)
+
+
+def _delete_orphans(conn):
+    """
+    Sebelum foreign_keys=ON, menghapus kriteria/alternatif tidak ikut
+    menghapus nilai & pairwise-nya. Bersihkan sisa baris yatim tersebut.
+    """
+    conn.execute(text(
+        "DELETE FROM alternative_values WHERE alternative_id NOT IN (SELECT id FROM alternatives)"
+        " OR criterion_id NOT IN (SELECT id FROM criteria)"
+    ))
+    conn.execute(text(
+        "DELETE FROM pairwise WHERE criterion_i_id NOT IN (SELECT id FROM criteria)"
+        " OR criterion_j_id NOT IN (SELECT id FROM criteria)"
+    ))
+
+
+def _v1(conn):
+    _create_indexes(conn, "ix_ahp_result_created_at", "ix_alternative_values_criterion_id", "ix_pairwise_criterion_j_id")
+    _delete_orphans(conn)
+
+
+def _create_missing_tables(conn):
+    db.metadata.create_all(conn)
+
+
+def _add_job_heartbeat(conn):
+    """jobs.heartbeat_at (+ indeks) untuk mendeteksi job yang workernya mati."""
+    columns = {row[1] for row in conn.execute(text("PRAGMA table_info(jobs)"))}
+    if "heartbeat_at" not in columns:
+        conn.execute(text("ALTER TABLE jobs ADD COLUMN heartbeat_at DATETIME"))
+    _create_indexes(conn, "ix_jobs_heartbeat_at")
+
+
+def _add_block_version(conn):
+    """
+    matrix_store_blocks.version: blok yang tidak berubah sejak store di cache
+    proses tidak perlu dibaca ulang. Isi store lama dibuang (hanya cache,
+    dibangun ulang saat dibaca) karena versi bloknya tidak diketahui.
+    """
+    columns = {row[1] for row in conn.execute(text("PRAGMA table_info(matrix_store_blocks)"))}
+    if "version" not in columns:
+        conn.execute(text("ALTER TABLE matrix_store_blocks ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(text("DELETE FROM matrix_store_blocks"))
+    conn.execute(text("DELETE FROM matrix_store"))
+
+
+MIGRATIONS = [
+    (1, _v1),  # indeks FK/created_at + bersihkan baris yatim
+    (2, _create_missing_tables),  # matrix_store, matrix_store_blocks
+    (3, _create_missing_tables),  # ranking_snapshots
+    (4, _create_missing_tables),  # evaluators, evaluator_pairwise, group_ahp_state
+    (5, _add_job_heartbeat),  # jobs.heartbeat_at
+    (6, _add_block_version),  # matrix_store_blocks.version
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn) -> int:
+    if conn.dialect.name != "sqlite":
+        return 0
+    return int(conn.exec_driver_sql("PRAGMA user_version").scalar() or 0)
+
+
+def upgrade_schema(engine):
+    """Jalankan langkah migrasi yang belum tercatat di user_version (dalam satu transaksi)."""
+    with engine.begin() as conn:
+        current = schema_version(conn)
+        for version, step in MIGRATIONS:
+            if version <= current:
+                continue
+            logger.info("Migrasi skema ke versi %s", version)
+            step(conn)
+            if conn.dialect.name == "sqlite":
+                conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+
+def ensure_schema(engine, always: bool = False) -> bool:
+    """
+    Buat tabel + jalankan migrasi, kecuali skema sudah versi terbaru
+    (cukup satu PRAGMA saat boot). Return True bila skema diperiksa/diubah.
+    """
+    if not always:
+        with engine.connect() as conn:
+            if schema_version(conn) >= SCHEMA_VERSION:
+                return False
+    db.metadata.create_all(engine)
+    upgrade_schema(engine)
+    return True
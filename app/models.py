@@ -29,7 +29,7 @@ class AlternativeValue(db.Model):
     __tablename__ = "alternative_values"
     id = db.Column(db.Integer, primary_key=True)
     alternative_id = db.Column(db.Integer, db.ForeignKey("alternatives.id", ondelete="CASCADE"), nullable=False)
-    criterion_id = db.Column(db.Integer, db.ForeignKey("criteria.id", ondelete="CASCADE"), nullable=False)
+    criterion_id = db.Column(db.Integer, db.ForeignKey("criteria.id", ondelete="CASCADE"), nullable=False, index=True)
     value = db.Column(db.Float, nullable=False)
 
     alternative = db.relationship("Alternative", backref=db.backref("values", cascade="all, delete-orphan"))
@@ -41,17 +41,99 @@ class Pairwise(db.Model):
     __tablename__ = "pairwise"
     id = db.Column(db.Integer, primary_key=True)
     criterion_i_id = db.Column(db.Integer, db.ForeignKey("criteria.id", ondelete="CASCADE"), nullable=False)
-    criterion_j_id = db.Column(db.Integer, db.ForeignKey("criteria.id", ondelete="CASCADE"), nullable=False)
+    criterion_j_id = db.Column(db.Integer, db.ForeignKey("criteria.id", ondelete="CASCADE"), nullable=False, index=True)
     value = db.Column(db.Float, nullable=False)  # i vs j
 
     criterion_i = db.relationship("Criterion", foreign_keys=[criterion_i_id])
     criterion_j = db.relationship("Criterion", foreign_keys=[criterion_j_id])
 
+    # uq_pairwise juga menjadi indeks untuk criterion_i_id (kolom terdepan)
     __table_args__ = (db.UniqueConstraint("criterion_i_id", "criterion_j_id", name="uq_pairwise"),)
 
+class Evaluator(db.Model):
+    __tablename__ = "evaluators"
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False, unique=True)
+    weight = db.Column(db.Float, nullable=False, default=1.0)  # bobot penilai dalam agregasi kelompok
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class EvaluatorPairwise(db.Model):
+    __tablename__ = "evaluator_pairwise"
+    id = db.Column(db.Integer, primary_key=True)
+    evaluator_id = db.Column(db.Integer, db.ForeignKey("evaluators.id", ondelete="CASCADE"), nullable=False)
+    criterion_i_id = db.Column(db.Integer, db.ForeignKey("criteria.id", ondelete="CASCADE"), nullable=False)
+    criterion_j_id = db.Column(db.Integer, db.ForeignKey("criteria.id", ondelete="CASCADE"), nullable=False, index=True)
+    value = db.Column(db.Float, nullable=False)  # i vs j
+
+    # uq_evaluator_pairwise juga menjadi indeks untuk evaluator_id (kolom terdepan)
+    __table_args__ = (db.UniqueConstraint("evaluator_id", "criterion_i_id", "criterion_j_id", name="uq_evaluator_pairwise"),)
+
+class GroupAhpState(db.Model):
+    __tablename__ = "group_ahp_state"
+    id = db.Column(db.Integer, primary_key=True)  # selalu 1
+    version = db.Column(db.Integer, nullable=False, default=1)  # naik di setiap penulisan (optimistic lock)
+    payload = db.Column(db.LargeBinary, nullable=False)  # pickle: GroupAggregate.state()
+
 class AhpResult(db.Model):
     __tablename__ = "ahp_result"
     id = db.Column(db.Integer, primary_key=True)
     weights_json = db.Column(db.Text, nullable=False)  # {criterion_id: weight}
     cr = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class RankingSnapshot(db.Model):
+    __tablename__ = "ranking_snapshots"
+    id = db.Column(db.Integer, primary_key=True)
+    data_version = db.Column(db.Integer, nullable=False)
+    method = db.Column(db.String(40), nullable=False)  # kunci MCDM_METHODS
+    ahp_result_id = db.Column(db.Integer, db.ForeignKey("ahp_result.id", ondelete="SET NULL"), nullable=True, index=True)
+    cr = db.Column(db.Float, nullable=True)
+    n = db.Column(db.Integer, nullable=False)
+    # array little-endian terkemas, urut id alternatif
+    ids = db.Column(db.LargeBinary, nullable=False)  # int32
+    scores = db.Column(db.LargeBinary, nullable=False)  # float32
+    ranks = db.Column(db.LargeBinary, nullable=False)  # int32
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.UniqueConstraint("data_version", "method", name="uq_snapshot_version_method"),)
+
+class DataVersion(db.Model):
+    __tablename__ = "data_version"
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class RankingCacheEntry(db.Model):
+    __tablename__ = "ranking_cache"
+    key = db.Column(db.String(200), primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)  # .npz, lihat cache.encode_payload
+    last_used = db.Column(db.Float, nullable=False)
+
+class MatrixStoreHeader(db.Model):
+    __tablename__ = "matrix_store"
+    id = db.Column(db.Integer, primary_key=True)  # selalu 1
+    version = db.Column(db.Integer, nullable=False)  # versi matriks (data_version id=2)
+    block_size = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)  # pickle: kriteria + statistik kolom
+
+class MatrixStoreBlock(db.Model):
+    __tablename__ = "matrix_store_blocks"
+    block = db.Column(db.Integer, primary_key=True)  # alternative_id // block_size
+    version = db.Column(db.Integer, nullable=False, default=0)  # versi matriks saat blok terakhir ditulis
+    payload = db.Column(db.LargeBinary, nullable=False)  # pickle: baris, nilai, present, gap
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)  # ahp | sensitivity | import
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued | running | done | failed
+    progress = db.Column(db.Float, nullable=False, default=0.0)  # 0..1
+    message = db.Column(db.String(500), nullable=True)
+    params_json = db.Column(db.Text, nullable=False, default="{}")
+    result_json = db.Column(db.Text, nullable=True)
+    worker = db.Column(db.String(80), nullable=True)  # host:pid yang menjalankan
+    heartbeat_at = db.Column(db.DateTime, nullable=True, index=True)  # disegarkan berkala selama queued/running
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,249 @@
+"""
+profiling.py - Instrumentasi per-request (opt-in, PROFILING_ENABLED)
+
+Yang dicatat untuk setiap request:
+  - jumlah dan durasi statement SQL (event hook SQLAlchemy)
+  - blok bertanda di route handler: `with timed("ranking"): ...`
+  - waktu render template Jinja (sinyal before_render_template/template_rendered)
+
+Hasilnya dikirim sebagai header Server-Timing, diakumulasi ke /metrics
+(format teks Prometheus, per proses), dan bila PROFILE_SLOWEST_N > 0,
+sebagian request diprofil dengan cProfile; dump .prof hanya disimpan untuk
+N request paling lambat.
+"""
+
+import cProfile
+import heapq
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+
+from . import db
+
+logger = logging.getLogger(__name__)
+
+# batas bucket histogram durasi request (detik)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestProfile:
+    """Waktu yang terkumpul selama satu request."""
+
+    __slots__ = ("start", "sql_count", "sql_seconds", "blocks", "profiler")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.blocks = defaultdict(float)  # nama blok -> detik
+        self.profiler = None
+
+
+class Metrics:
+    """Akumulator metrik per proses (thread-safe)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)  # (endpoint, method, status) -> jumlah
+        self.duration_sum = defaultdict(float)  # endpoint -> detik
+        self.duration_buckets = defaultdict(lambda: [0] * len(BUCKETS))  # endpoint -> hitungan kumulatif
+        self.duration_count = defaultdict(int)
+        self.sql_count = defaultdict(int)  # endpoint -> statement
+        self.sql_seconds = defaultdict(float)
+        self.block_seconds = defaultdict(float)  # (endpoint, blok) -> detik
+
+    def observe(self, endpoint: str, method: str, status: int, seconds: float, prof: RequestProfile):
+        with self.lock:
+            self.requests[(endpoint, method, status)] += 1
+            self.duration_sum[endpoint] += seconds
+            self.duration_count[endpoint] += 1
+            buckets = self.duration_buckets[endpoint]
+            for k, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    buckets[k] += 1
+            self.sql_count[endpoint] += prof.sql_count
+            self.sql_seconds[endpoint] += prof.sql_seconds
+            for name, secs in prof.blocks.items():
+                self.block_seconds[(endpoint, name)] += secs
+
+    def render(self) -> str:
+        """Teks eksposisi Prometheus (versi 0.0.4)."""
+        out = []
+
+        def family(name, kind, help_text):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            family("spk_requests_total", "counter", "Jumlah request HTTP.")
+            for (ep, method, status), n in sorted(self.requests.items()):
+                out.append(f'spk_requests_total{{endpoint="{_esc(ep)}",method="{method}",status="{status}"}} {n}')
+
+            family("spk_request_duration_seconds", "histogram", "Durasi request HTTP.")
+            for ep in sorted(self.duration_count):
+                label = f'endpoint="{_esc(ep)}"'
+                for bound, n in zip(BUCKETS, self.duration_buckets[ep]):
+                    out.append(f'spk_request_duration_seconds_bucket{{{label},le="{bound}"}} {n}')
+                out.append(f'spk_request_duration_seconds_bucket{{{label},le="+Inf"}} {self.duration_count[ep]}')
+                out.append(f"spk_request_duration_seconds_sum{{{label}}} {self.duration_sum[ep]:.6f}")
+                out.append(f"spk_request_duration_seconds_count{{{label}}} {self.duration_count[ep]}")
+
+            family("spk_sql_statements_total", "counter", "Statement SQL yang dieksekusi per endpoint.")
+            for ep, n in sorted(self.sql_count.items()):
+                out.append(f'spk_sql_statements_total{{endpoint="{_esc(ep)}"}} {n}')
+
+            family("spk_sql_seconds_total", "counter", "Total waktu eksekusi SQL per endpoint.")
+            for ep, secs in sorted(self.sql_seconds.items()):
+                out.append(f'spk_sql_seconds_total{{endpoint="{_esc(ep)}"}} {secs:.6f}')
+
+            family("spk_block_seconds_total", "counter", "Total waktu blok bertanda (timed/render) per endpoint.")
+            for (ep, name), secs in sorted(self.block_seconds.items()):
+                out.append(f'spk_block_seconds_total{{endpoint="{_esc(ep)}",block="{_esc(name)}"}} {secs:.6f}')
+
+        return "\n".join(out) + "\n"
+
+
+def _esc(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _current() -> RequestProfile:
+    if has_request_context():
+        return g.get("_profile")
+    return None
+
+
+@contextmanager
+def timed(name: str):
+    """Catat durasi blok ke profil request aktif; tanpa biaya berarti bila profiling mati."""
+    prof = _current()
+    if prof is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        prof.blocks[name] += time.perf_counter() - t0
+
+
+class SlowestProfiles:
+    """Simpan dump cProfile hanya untuk N request paling lambat (min-heap durasi)."""
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = keep
+        self.heap = []  # (detik, path)
+        self.lock = threading.Lock()
+        # cProfile hanya boleh aktif di satu thread pada satu waktu
+        self.active = threading.Lock()
+
+    def offer(self, seconds: float, label: str, profiler: cProfile.Profile):
+        with self.lock:
+            if len(self.heap) >= self.keep and seconds <= self.heap[0][0]:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", label)[:80]
+            path = os.path.join(self.directory, f"{seconds * 1000:09.1f}ms-{safe}-{int(time.time() * 1000)}.prof")
+            profiler.dump_stats(path)
+            heapq.heappush(self.heap, (seconds, path))
+            if len(self.heap) > self.keep:
+                _, old = heapq.heappop(self.heap)
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+
+def _listen_sql(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_spk_t0", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("_spk_t0")
+        if not stack:
+            return
+        elapsed = time.perf_counter() - stack.pop()
+        prof = _current()
+        if prof is not None:
+            prof.sql_count += 1
+            prof.sql_seconds += elapsed
+
+
+def init_profiling(app):
+    """Pasang hook profiling dan route /metrics pada app (dipanggil dari create_app)."""
+    metrics = Metrics()
+    keep = app.config.get("PROFILE_SLOWEST_N", 0)
+    slowest = SlowestProfiles(app.config["PROFILE_DIR"], keep) if keep > 0 else None
+    sample_rate = app.config.get("PROFILE_SAMPLE_RATE", 0.1)
+    app.extensions["profiling"] = metrics
+
+    with app.app_context():
+        _listen_sql(db.engine)
+
+    @app.before_request
+    def _start():
+        prof = g._profile = RequestProfile()
+        if slowest and random.random() < sample_rate and slowest.active.acquire(blocking=False):
+            prof.profiler = cProfile.Profile()
+            prof.profiler.enable()
+
+    @app.after_request
+    def _finish(resp):
+        prof = g.pop("_profile", None)
+        if prof is None:
+            return resp
+        total = time.perf_counter() - prof.start
+        if prof.profiler is not None:
+            prof.profiler.disable()
+            slowest.active.release()
+            try:
+                slowest.offer(total, f"{request.method}-{request.path}", prof.profiler)
+            except OSError as e:
+                logger.warning("Gagal menyimpan dump profil: %s", e)
+
+        endpoint = request.endpoint or "unknown"
+        if endpoint != "metrics":
+            metrics.observe(endpoint, request.method, resp.status_code, total, prof)
+
+        parts = [f'db;dur={prof.sql_seconds * 1000:.2f};desc="SQL x{prof.sql_count}"']
+        parts += [f"{name};dur={secs * 1000:.2f}" for name, secs in prof.blocks.items()]
+        parts.append(f"total;dur={total * 1000:.2f}")
+        resp.headers["Server-Timing"] = ", ".join(parts)
+        return resp
+
+    @app.teardown_request
+    def _abandon(exc):
+        # after_request tidak dipanggil saat exception; pastikan profiler dilepas
+        prof = g.pop("_profile", None)
+        if prof is not None and prof.profiler is not None:
+            prof.profiler.disable()
+            slowest.active.release()
+
+    def _render_start(sender, template, context, **extra):
+        if _current() is not None:
+            g._render_t0 = time.perf_counter()
+
+    def _render_end(sender, template, context, **extra):
+        prof = _current()
+        t0 = g.pop("_render_t0", None)
+        if prof is not None and t0 is not None:
+            prof.blocks["render"] += time.perf_counter() - t0
+
+    before_render_template.connect(_render_start, app, weak=False)
+    template_rendered.connect(_render_end, app, weak=False)
+
+    def metrics_view():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", "metrics", metrics_view)
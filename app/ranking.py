@@ -0,0 +1,382 @@
+"""
+ranking.py - Hasil ranking yang bisa di-cache, difilter dan dipotong per halaman
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from typing import TYPE_CHECKING
+from flask import current_app
+
+from .cache import cache_type, cached, current_data_version
+from .methods import SensitivityAnalysis, SegmentedProfileMatching, get_method
+from .methods.segmented import segment_codes
+from .models import AhpResult
+from .profiling import timed
+from .store import get_matrix_store
+from .snapshots import write_snapshot
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SORTS = {
+    "rank": "Ranking (skor tertinggi)",
+    "score_asc": "Skor terendah",
+    "name": "Nama (A-Z)",
+    "brand": "Brand (A-Z)",
+}
+
+
+@cache_type
+class Ranking:
+    """
+    Skor seluruh alternatif dalam bentuk array. Urutan global dan peringkat
+    dihitung sekali saat dibuat (objek ini yang disimpan di cache), lalu
+    setiap halaman/filter hanya memotong array tersebut.
+    """
+
+    ahp_result_id = None
+    method = "profile_matching"
+
+    def __init__(self, alternatives, scores: np.ndarray, criteria, weights: np.ndarray, cr: float,
+                 ahp_result_id: int = None, method: str = "profile_matching"):
+        import numpy as np
+        self.ids = np.array([a.id for a in alternatives], dtype=np.int64)
+        self.names = np.array([a.name for a in alternatives], dtype=object)
+        self.brands = np.array([a.brand or "" for a in alternatives], dtype=object)
+        self.sports = np.array([a.sport or "" for a in alternatives], dtype=object)
+        self.source_urls = np.array([a.source_url for a in alternatives], dtype=object)
+        self.scores = np.asarray(scores, dtype=float)
+        self.criteria = [{"id": c.id, "name": c.name, "ctype": c.ctype} for c in criteria]
+        self.weights = np.asarray(weights, dtype=float)
+        self.cr = float(cr)
+        self.ahp_result_id = ahp_result_id
+        self.method = method
+
+        # urutan global (skor turun, stabil menurut id) + peringkat via inverse permutation
+        self.order = np.argsort(-self.scores, kind="stable")
+        self.rank = np.empty(len(self.scores), dtype=np.int64)
+        self.rank[self.order] = np.arange(1, len(self.scores) + 1)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def facets(self):
+        """Nilai unik brand dan sport untuk pilihan filter."""
+        return {
+            "brands": sorted(b for b in set(self.brands) if b),
+            "sports": sorted(s for s in set(self.sports) if s),
+        }
+
+    def select(self, brand=None, sport=None, q=None) -> np.ndarray:
+        """Indeks baris yang lolos filter, dalam urutan id."""
+        import numpy as np
+        mask = np.ones(len(self), dtype=bool)
+        if brand:
+            mask &= self.brands == brand
+        if sport:
+            mask &= self.sports == sport
+        if q:
+            lowered = np.char.lower(self.names.astype(str))
+            mask &= np.char.find(lowered, q.lower()) >= 0
+        return np.flatnonzero(mask)
+
+    def top_k(self, k: int, idx: np.ndarray = None) -> np.ndarray:
+        """K skor tertinggi dengan argpartition (O(m)), lalu hanya K itu yang diurutkan."""
+        import numpy as np
+        idx = np.arange(len(self)) if idx is None else idx
+        if k <= 0 or len(idx) == 0:
+            return idx[:0]
+        if k < len(idx):
+            part = np.argpartition(-self.scores[idx], k - 1)[:k]
+            idx = idx[part]
+        return idx[np.lexsort((self.ids[idx], -self.scores[idx]))]
+
+    def sorted(self, idx: np.ndarray, sort: str = "rank") -> np.ndarray:
+        """Urutkan subset indeks menurut kunci sort."""
+        import numpy as np
+        if sort == "score_asc":
+            return idx[np.argsort(-self.rank[idx])]
+        if sort == "name":
+            return idx[np.argsort(self.names[idx].astype(str), kind="stable")]
+        if sort == "brand":
+            return idx[np.lexsort((self.rank[idx], self.brands[idx].astype(str)))]
+        return idx[np.argsort(self.rank[idx])]
+
+    def rows(self, idx: np.ndarray):
+        """Baris siap-render untuk indeks yang diberikan."""
+        return [
+            {
+                "id": int(self.ids[i]),
+                "rank": int(self.rank[i]),
+                "name": self.names[i],
+                "brand": self.brands[i] or None,
+                "sport": self.sports[i] or None,
+                "score": float(self.scores[i]),
+                "source_url": self.source_urls[i],
+            }
+            for i in idx
+        ]
+
+
+SEGMENTS = {
+    "sport": "Olahraga",
+    "brand": "Brand",
+}
+
+
+@cache_type
+class SegmentedRanking:
+    """
+    Ranking Profile Matching per segmen (sport / brand): setiap segmen punya
+    profil ideal sendiri. Semua segmen dihitung dalam satu pass; top-K per
+    segmen hanya memotong urutan yang sudah tersimpan.
+    """
+
+    def __init__(self, by: str, alternatives, values: np.ndarray, criteria, is_benefit: np.ndarray,
+                 weights: np.ndarray, ahp_result_id: int = None):
+        import numpy as np
+        self.by = by
+        self.ids = np.array([a.id for a in alternatives], dtype=np.int64)
+        self.names = np.array([a.name for a in alternatives], dtype=object)
+        self.brands = np.array([a.brand or "" for a in alternatives], dtype=object)
+        self.sports = np.array([a.sport or "" for a in alternatives], dtype=object)
+        self.criteria = [{"id": c.id, "name": c.name, "ctype": c.ctype} for c in criteria]
+        self.weights = np.asarray(weights, dtype=float)
+        self.ahp_result_id = ahp_result_id
+
+        self.labels, self.codes = segment_codes(self.sports if by == "sport" else self.brands)
+        result = SegmentedProfileMatching.calculate(
+            values, self.weights, is_benefit, self.codes, len(self.labels), ids=self.ids,
+        )
+        self.scores = result["scores"]
+        self.ideal = result["ideal"]
+        self.order = result["order"]
+        self.starts = result["starts"]
+        self.rank = result["rank"]
+
+    def segments(self, top_k: int, only: str = None):
+        """Daftar segmen (urut label) beserta top-K alternatifnya."""
+        out = []
+        for g, label in enumerate(self.labels):
+            if only is not None and label != only:
+                continue
+            lo, hi = self.starts[g], self.starts[g + 1]
+            idx = self.order[lo:min(hi, lo + top_k)] if top_k > 0 else self.order[lo:hi]
+            out.append({
+                "segment": label or None,
+                "size": int(hi - lo),
+                "ideal": {c["id"]: float(v) for c, v in zip(self.criteria, self.ideal[g])},
+                "top": [
+                    {
+                        "id": int(self.ids[i]),
+                        "rank": int(self.rank[i]),
+                        "name": self.names[i],
+                        "brand": self.brands[i] or None,
+                        "sport": self.sports[i] or None,
+                        "score": float(self.scores[i]),
+                    }
+                    for i in idx
+                ],
+            })
+        return out
+
+
+class Page:
+    """Informasi paginasi sederhana untuk template."""
+
+    def __init__(self, page: int, per_page: int, total: int):
+        self.per_page = per_page
+        self.total = total
+        self.pages = max(1, math.ceil(total / per_page))
+        self.page = min(max(1, page), self.pages)
+        self.start = (self.page - 1) * per_page
+        self.end = min(self.start + per_page, total)
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+    def window(self, size: int = 2):
+        """Nomor halaman di sekitar halaman aktif."""
+        return range(max(1, self.page - size), min(self.pages, self.page + size) + 1)
+
+
+class RankingUnavailable(Exception):
+    """Ranking belum bisa dihitung; `endpoint` = halaman untuk melengkapi data."""
+
+    def __init__(self, message: str, endpoint: str):
+        super().__init__(message)
+        self.endpoint = endpoint
+
+
+def check_matrix(matrix):
+    """Pastikan data tidak dummy dan lengkap; raise RankingUnavailable jika belum."""
+    if not matrix.criteria:
+        raise RankingUnavailable("Anda belum menambahkan Kriteria beserta Sumber. Perhitungan belum dapat dijalankan.", "main.index")
+    if not matrix.alternatives:
+        raise RankingUnavailable("Anda belum menambahkan Alternatif (produk sepatu) beserta Sumber. Perhitungan belum dapat dijalankan.", "main.index")
+    # pastikan semua alternatif punya nilai untuk semua kriteria
+    alt = matrix.first_incomplete()
+    if alt is not None:
+        raise RankingUnavailable(f"Alternatif '{alt.name}' belum memiliki nilai untuk semua kriteria. Lengkapi di menu Data Alternatif.", "main.index")
+
+
+def latest_ahp_result():
+    return AhpResult.query.order_by(AhpResult.created_at.desc()).first()
+
+
+def weights_vector(weights_map, criteria) -> np.ndarray:
+    """
+    Bobot {criterion_id: w} (hasil json) -> array sesuai urutan kriteria.
+    KeyError bila ada kriteria yang belum punya bobot (ditambah setelah run AHP).
+    """
+    import numpy as np
+    weights_map = {str(k): v for k, v in weights_map.items()}
+    missing = [c.name for c in criteria if str(c.id) not in weights_map]
+    if missing:
+        raise KeyError(f"Kriteria tanpa bobot AHP: {', '.join(missing)}")
+    return np.array([weights_map[str(c.id)] for c in criteria], dtype=float)
+
+
+class DecisionInputs:
+    """Matriks keputusan lengkap + bobot AHP terakhir; dipakai bersama oleh semua metode."""
+
+    def __init__(self, matrix, weights: np.ndarray, cr: float, ahp_result_id: int):
+        self.matrix = matrix
+        self.weights = weights
+        self.cr = cr
+        self.ahp_result_id = ahp_result_id
+
+
+def build_decision_inputs() -> DecisionInputs:
+    with timed("matrix"):
+        matrix = get_matrix_store()
+    check_matrix(matrix)
+
+    last = latest_ahp_result()
+    if not last:
+        raise RankingUnavailable("Anda belum menjalankan AHP untuk menghasilkan bobot kriteria.", "main.ahp")
+
+    try:
+        weights = weights_vector(json.loads(last.weights_json), matrix.criteria)
+    except KeyError as e:
+        raise RankingUnavailable(f"{e.args[0]}. Jalankan AHP lagi setelah menambah kriteria.", "main.ahp")
+    return DecisionInputs(matrix, weights, float(last.cr), last.id)
+
+
+def get_decision_inputs() -> DecisionInputs:
+    """Matriks + bobot untuk versi data saat ini (cache per proses, tidak dipickle ke tabel)."""
+    return cached("decision", build_decision_inputs, persist=False)
+
+
+def resolve_method(method: str = None) -> str:
+    """Kunci metode MCDM (default MCDM_DEFAULT_METHOD); ValueError bila tidak terdaftar."""
+    method = method or current_app.config.get("MCDM_DEFAULT_METHOD", "profile_matching")
+    get_method(method)
+    return method
+
+
+def build_ranking(method: str = "profile_matching") -> Ranking:
+    inputs = get_decision_inputs()
+    matrix = inputs.matrix
+    with timed("score"):
+        try:
+            final = get_method(method).scores_for(matrix, inputs.weights)
+        except ValueError as e:
+            raise RankingUnavailable(str(e), "main.data")
+
+    return Ranking(matrix.alternatives, final, matrix.criteria, inputs.weights, inputs.cr,
+                   ahp_result_id=inputs.ahp_result_id, method=method)
+
+
+def get_ranking(method: str = None) -> Ranking:
+    """
+    Ranking untuk versi data saat ini dengan metode MCDM tertentu (dari cache bila ada).
+    Saat dihitung, ranking juga ditulis sebagai snapshot untuk versi data tersebut.
+    """
+    method = resolve_method(method)
+
+    def compute():
+        version = current_data_version()
+        ranking = build_ranking(method)
+        if current_data_version() == version:
+            write_snapshot(ranking, version)
+        return ranking
+
+    return cached(f"ranking:{method}", compute)
+
+
+def materialize_ranking():
+    """Hitung ranking versi data saat ini agar snapshot-nya tertulis (mis. setelah run AHP)."""
+    try:
+        get_ranking()
+    except RankingUnavailable:
+        pass
+
+
+def get_segmented_ranking(by: str) -> SegmentedRanking:
+    """Ranking per segmen untuk versi data saat ini (dari cache bila ada)."""
+    if by not in SEGMENTS:
+        raise ValueError(f"Segmen harus salah satu dari {tuple(SEGMENTS)}")
+
+    def compute():
+        inputs = get_decision_inputs()
+        matrix = inputs.matrix
+        with timed("score"):
+            return SegmentedRanking(by, matrix.alternatives, matrix.values, matrix.criteria, matrix.is_benefit,
+                                    inputs.weights, ahp_result_id=inputs.ahp_result_id)
+
+    return cached(f"segments:{by}", compute)
+
+
+def sensitivity_params(args, max_samples: int) -> dict:
+    """Parameter analisis sensitivitas dari query string / MultiDict."""
+    params = {
+        "samples": min(args.get("samples", 5000, type=int), max_samples),
+        "mode": args.get("mode", "dirichlet"),
+        "concentration": args.get("concentration", 100.0, type=float),
+        "jitter": args.get("jitter", 0.1, type=float),
+        "top_k": args.get("top", 10, type=int),
+        "n_bins": args.get("bins", 10, type=int),
+        "seed": args.get("seed", 0, type=int),
+    }
+    if params["mode"] not in ("dirichlet", "jitter"):
+        raise ValueError("mode harus 'dirichlet' atau 'jitter'")
+    if not 0 < params["jitter"] < 1:
+        raise ValueError("jitter harus di antara 0 dan 1 (eksklusif)")
+    if not params["concentration"] > 0:
+        raise ValueError("concentration harus > 0")
+    return params
+
+
+def sensitivity_key(params: dict) -> str:
+    return "sensitivity:" + ":".join(f"{k}={params[k]}" for k in sorted(params))
+
+
+def sensitivity_report(params: dict, workers: int = 0):
+    """
+    Analisis sensitivitas Monte Carlo atas bobot AHP terakhir (di-cache per versi data).
+    None jika data belum lengkap / AHP belum dijalankan.
+    """
+    def compute():
+        try:
+            inputs = get_decision_inputs()
+        except RankingUnavailable:
+            return None
+        matrix = inputs.matrix
+        result = SensitivityAnalysis.calculate(
+            matrix.gap_scores(), inputs.weights,
+            [a.name for a in matrix.alternatives], workers=workers, **params,
+        )
+        for row in result["alternatives"]:
+            row["id"] = int(matrix.alt_ids[row.pop("index")])
+        result["ahp_result_id"] = inputs.ahp_result_id
+        return result
+
+    return cached(sensitivity_key(params), compute)
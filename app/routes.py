@@ -1,32 +1,53 @@
 from __future__ import annotations
 import json
-import numpy as np
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+import os
+import tempfile
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, Response, stream_with_context, jsonify, g
 from sqlalchemy import and_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from . import db
-from .models import Criterion, Alternative, AlternativeValue, Pairwise, AhpResult
-from .forms import CriterionForm, AlternativeForm
-from .methods import AHP, ProfileMatching
+from .api import json_request
+from .models import Criterion, Alternative, Pairwise, AhpResult, Job
+from .forms import CriterionForm, AlternativeForm, CatalogImportForm
+from .methods import AHP, GroupAHP, ScenarioAnalysis, MCDM_METHODS
+from .matrix import load_decision_matrix, upsert_values
+from .cache import bump_data_version
+from .catalog import import_catalog, export_csv, export_parquet
+from .ranking import Page, SORTS, SEGMENTS, RankingUnavailable, check_matrix, get_ranking, get_segmented_ranking, materialize_ranking, weights_vector, sensitivity_params, sensitivity_report
+from .similarity import get_similarity_index
+from .snapshots import list_snapshots, load_snapshot, diff_snapshots
+from .jobs import IMPORT_PREFIX, expire_stale_jobs, submit_job
+from .store import update_store, store_alternative
+from .group import list_evaluators, remove_evaluator, run_group_ahp, submit_judgments
+from .profiling import timed
 
 bp = Blueprint("main", __name__)
 
-def _guard_non_dummy():
-    criteria = Criterion.query.count()
-    alternatives = Alternative.query.count()
-    if criteria == 0:
-        flash("Anda belum menambahkan Kriteria beserta Sumber. Perhitungan belum dapat dijalankan.", "warning")
-        return False
-    if alternatives == 0:
-        flash("Anda belum menambahkan Alternatif (produk sepatu) beserta Sumber. Perhitungan belum dapat dijalankan.", "warning")
+DATA_SORTS = {
+    "id": ("Urutan input", Alternative.id),
+    "name": ("Nama (A-Z)", Alternative.name),
+    "brand": ("Brand (A-Z)", Alternative.brand),
+    "sport": ("Olahraga (A-Z)", Alternative.sport),
+}
+
+def _per_page():
+    per_page = request.args.get("per_page", current_app.config["PAGE_SIZE"], type=int)
+    return min(max(1, per_page), current_app.config["MAX_PAGE_SIZE"])
+
+def _page_args():
+    """Query string aktif tanpa 'page', untuk link paginasi."""
+    args = request.args.to_dict()
+    args.pop("page", None)
+    return args
+
+def _guard_non_dummy(matrix=None):
+    if matrix is None:
+        matrix = load_decision_matrix()
+    try:
+        check_matrix(matrix)
+    except RankingUnavailable as e:
+        flash(str(e), "warning")
         return False
-    # pastikan semua alternatif punya nilai untuk semua kriteria
-    crit_ids = [c.id for c in Criterion.query.order_by(Criterion.id).all()]
-    for alt in Alternative.query.order_by(Alternative.id).all():
-        vals = {v.criterion_id for v in AlternativeValue.query.filter_by(alternative_id=alt.id).all()}
-        missing = [cid for cid in crit_ids if cid not in vals]
-        if missing:
-            flash(f"Alternatif '{alt.name}' belum memiliki nilai untuk semua kriteria. Lengkapi di menu Data Alternatif.", "warning")
-            return False
     return True
 
 @bp.get("/")
@@ -47,6 +68,7 @@ def criteria():
         )
         try:
             db.session.add(c)
+            bump_data_version()
             db.session.commit()
             flash("Kriteria berhasil ditambahkan.", "success")
             return redirect(url_for("main.criteria"))
@@ -60,6 +82,7 @@ def criteria():
 def criteria_delete(cid: int):
     c = Criterion.query.get_or_404(cid)
     db.session.delete(c)
+    bump_data_version()
     db.session.commit()
     flash("Kriteria dihapus.", "info")
     return redirect(url_for("main.criteria"))
@@ -77,6 +100,9 @@ def alternatives():
         )
         try:
             db.session.add(a)
+            db.session.flush()
+            bump_data_version()
+            update_store(store_alternative(a.id))
             db.session.commit()
             flash("Alternatif berhasil ditambahkan.", "success")
             return redirect(url_for("main.alternatives"))
@@ -84,53 +110,151 @@ def alternatives():
             db.session.rollback()
             flash(f"Gagal menambah alternatif: {e}", "danger")
     items = Alternative.query.order_by(Alternative.id).all()
-    return render_template("alternatives.html", form=form, items=items)
+    return render_template("alternatives.html", form=form, import_form=CatalogImportForm(), items=items)
+
+@bp.post("/alternatives/import")
+def alternatives_import():
+    form = CatalogImportForm()
+    if not form.validate_on_submit():
+        for errors in form.errors.values():
+            for e in errors:
+                flash(f"Gagal import: {e}", "danger")
+        return redirect(url_for("main.alternatives"))
+
+    f = form.file.data
+    fmt = "parquet" if f.filename.lower().endswith(".parquet") else "csv"
+    if form.background.data:
+        fd, path = tempfile.mkstemp(prefix=IMPORT_PREFIX, suffix=f".{fmt}")
+        with os.fdopen(fd, "wb") as out:
+            f.save(out)
+        job = submit_job(current_app._get_current_object(), "import", {
+            "path": path, "format": fmt, "size": os.path.getsize(path),
+            "chunksize": current_app.config["CATALOG_CHUNK_SIZE"],
+            "max_errors": current_app.config["CATALOG_MAX_REPORTED_ERRORS"],
+        })
+        flash(f"Import dijalankan di latar belakang (job #{job.id}).", "info")
+        return redirect(url_for("main.jobs"))
+
+    try:
+        report = import_catalog(f.stream, fmt, chunksize=current_app.config["CATALOG_CHUNK_SIZE"])
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Gagal import: {e}", "danger")
+        return redirect(url_for("main.alternatives"))
+
+    flash(f"Import selesai: {report.imported} baris disimpan, {report.rejected} baris ditolak.", "success" if not report.errors else "warning")
+    limit = current_app.config["CATALOG_MAX_REPORTED_ERRORS"]
+    for line, msg in report.errors[:limit]:
+        flash(f"Baris {line}: {msg}", "warning")
+    if len(report.errors) > limit:
+        flash(f"... dan {len(report.errors) - limit} kesalahan lainnya.", "warning")
+    return redirect(url_for("main.alternatives"))
 
 @bp.post("/alternatives/<int:aid>/delete")
 def alternatives_delete(aid: int):
     a = Alternative.query.get_or_404(aid)
     db.session.delete(a)
+    bump_data_version()
+    update_store(lambda store: store.remove_alternatives([aid]))
     db.session.commit()
     flash("Alternatif dihapus.", "info")
     return redirect(url_for("main.alternatives"))
 
 @bp.route("/data", methods=["GET","POST"])
 def data():
-    criteria = Criterion.query.order_by(Criterion.id).all()
-    alternatives = Alternative.query.order_by(Alternative.id).all()
-
+    import numpy as np
     if request.method == "POST":
-        # Simpan nilai
+        # hanya alternatif yang tampil di halaman grid yang dikirim (hidden "alt")
+        posted = request.form.getlist("alt", type=int)
+        matrix = load_decision_matrix(posted or None)
+        criteria = matrix.criteria
+        alternatives = matrix.alternatives
+
+        # Simpan nilai: validasi seluruh form dulu, lalu tulis hanya sel yang berubah
         try:
-            for alt in alternatives:
-                for crit in criteria:
+            new_values = np.empty(matrix.shape, dtype=float)
+            for ai, alt in enumerate(alternatives):
+                for ci, crit in enumerate(criteria):
                     key = f"v_{alt.id}_{crit.id}"
                     raw = request.form.get(key, "").strip()
                     if raw == "":
                         raise ValueError(f"Nilai kosong untuk {alt.name} - {crit.name}")
-                    val = float(raw)
+                    try:
+                        new_values[ai, ci] = float(raw)
+                    except ValueError:
+                        raise ValueError(f"Nilai tidak valid untuk {alt.name} - {crit.name}: '{raw}'")
 
-                    existing = AlternativeValue.query.filter_by(alternative_id=alt.id, criterion_id=crit.id).first()
-                    if existing:
-                        existing.value = val
-                    else:
-                        db.session.add(AlternativeValue(alternative_id=alt.id, criterion_id=crit.id, value=val))
+            changed = ~matrix.present | (matrix.values != new_values)
+            rows, cols = np.nonzero(changed)
+            upsert_values([
+                {"alternative_id": int(matrix.alt_ids[i]), "criterion_id": int(matrix.crit_ids[j]), "value": float(new_values[i, j])}
+                for i, j in zip(rows, cols)
+            ])
+            if len(rows):
+                bump_data_version()
+                update_store(lambda store: store.set_values(matrix.alt_ids[rows], matrix.crit_ids[cols], new_values[rows, cols]))
             db.session.commit()
             flash("Data alternatif berhasil disimpan.", "success")
         except Exception as e:
             db.session.rollback()
             flash(f"Gagal menyimpan data: {e}", "danger")
-        return redirect(url_for("main.data"))
+        return redirect(url_for("main.data", **request.args))
 
-    # prepare current values
-    value_map = {}
-    for v in AlternativeValue.query.all():
-        value_map[(v.alternative_id, v.criterion_id)] = v.value
+    brand = request.args.get("brand") or None
+    sport = request.args.get("sport") or None
+    q = request.args.get("q", "").strip() or None
+    sort = request.args.get("sort", "id")
+    if sort not in DATA_SORTS:
+        sort = "id"
 
-    return render_template("data.html", criteria=criteria, alternatives=alternatives, value_map=value_map)
+    query = Alternative.query
+    if brand:
+        query = query.filter(Alternative.brand == brand)
+    if sport:
+        query = query.filter(Alternative.sport == sport)
+    if q:
+        query = query.filter(Alternative.name.ilike(f"%{q}%"))
+    page = Page(request.args.get("page", 1, type=int), _per_page(), query.count())
+    page_ids = [
+        aid for (aid,) in query.with_entities(Alternative.id)
+        .order_by(DATA_SORTS[sort][1], Alternative.id)
+        .offset(page.start).limit(page.per_page)
+    ]
+
+    # prepare current values (hanya baris di halaman ini)
+    with timed("matrix"):
+        matrix = load_decision_matrix(page_ids)
+    facets = {
+        "brands": [b for (b,) in db.session.query(Alternative.brand).filter(Alternative.brand.isnot(None)).distinct().order_by(Alternative.brand)],
+        "sports": [s for (s,) in db.session.query(Alternative.sport).filter(Alternative.sport.isnot(None)).distinct().order_by(Alternative.sport)],
+    }
+    return render_template(
+        "data.html", criteria=matrix.criteria, alternatives=matrix.alternatives, value_map=matrix.value_map(),
+        page=page, args=_page_args(), facets=facets, sorts={k: v[0] for k, v in DATA_SORTS.items()},
+    )
+
+@bp.get("/data/export")
+def data_export():
+    fmt = request.args.get("format", "csv")
+    batch = current_app.config["CATALOG_CHUNK_SIZE"]
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa
+        except ImportError:
+            flash("Export Parquet membutuhkan paket pyarrow.", "danger")
+            return redirect(url_for("main.data"))
+        body, mimetype = export_parquet(batch), "application/vnd.apache.parquet"
+    else:
+        fmt, body, mimetype = "csv", export_csv(batch), "text/csv"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=katalog_sepatu.{fmt}"},
+    )
 
 @bp.route("/ahp", methods=["GET","POST"])
 def ahp():
+    import numpy as np
     criteria = Criterion.query.order_by(Criterion.id).all()
     n = len(criteria)
     if n < 2:
@@ -144,37 +268,55 @@ def ahp():
 
     if request.method == "POST":
         try:
-            # save all upper-triangle inputs
+            method = request.form.get("method", current_app.config["AHP_WEIGHT_METHOD"])
+            if method not in AHP.METHODS:
+                raise ValueError(f"Metode bobot tidak dikenal: {method}")
+
+            # read all upper-triangle inputs and build the matrix
+            # (ids dicatat dulu: objek Criterion kedaluwarsa setelah commit)
+            crit_ids = [c.id for c in criteria]
+            mat = np.ones((n, n), dtype=float)
             for i in range(n):
                 for j in range(i+1, n):
-                    ci, cj = criteria[i].id, criteria[j].id
+                    ci, cj = crit_ids[i], crit_ids[j]
                     raw = request.form.get(f"p_{ci}_{cj}", "").strip()
                     if raw == "":
                         raise ValueError("Ada nilai perbandingan berpasangan yang kosong.")
                     val = float(raw)
                     if val <= 0:
                         raise ValueError("Nilai AHP harus > 0.")
-                    existing = Pairwise.query.filter_by(criterion_i_id=ci, criterion_j_id=cj).first()
-                    if existing:
-                        existing.value = val
-                    else:
-                        db.session.add(Pairwise(criterion_i_id=ci, criterion_j_id=cj, value=val))
-            db.session.commit()
+                    mat[i, j] = val
+                    mat[j, i] = 1.0 / val
 
-            # compute matrix
-            mat = np.ones((n, n), dtype=float)
-            for i in range(n):
-                for j in range(i+1, n):
-                    ci, cj = criteria[i].id, criteria[j].id
-                    v = Pairwise.query.filter_by(criterion_i_id=ci, criterion_j_id=cj).first().value
-                    mat[i, j] = v
-                    mat[j, i] = 1.0 / v
+            # penilaian atas nama penilai: disimpan per penilai, bobot utama tidak diubah
+            evaluator = request.form.get("evaluator", "").strip()
+            if evaluator:
+                _, _, cr = submit_judgments(evaluator, mat, crit_ids)
+                flash(f"Penilaian {evaluator} disimpan. CR = {cr:.4f}", "success")
+                if cr >= 0.10:
+                    flash("CR >= 0.10 (kurang konsisten). Pertimbangkan revisi perbandingan berpasangan.", "warning")
+                return redirect(url_for("main.ahp"))
+
+            # save them with one upsert
+            stmt = sqlite_insert(Pairwise.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["criterion_i_id", "criterion_j_id"], set_={"value": stmt.excluded.value}
+            )
+            iu = np.triu_indices(n, 1)
+            db.session.execute(stmt, [
+                {"criterion_i_id": crit_ids[i], "criterion_j_id": crit_ids[j], "value": float(mat[i, j])}
+                for i, j in zip(*iu)
+            ])
+            db.session.commit()
 
-            weights, cr = AHP.calculate_weights(mat)
-            weights_map = {criteria[idx].id: float(weights[idx]) for idx in range(n)}
+            with timed("ahp"):
+                weights, cr = AHP.calculate_weights(mat, method=method)
+            weights_map = {crit_ids[idx]: float(weights[idx]) for idx in range(n)}
 
             db.session.add(AhpResult(weights_json=json.dumps(weights_map), cr=float(cr)))
+            bump_data_version(matrix=False)
             db.session.commit()
+            materialize_ranking()
 
             flash(f"Bobot AHP dihitung. CR = {cr:.4f}", "success")
             if cr >= 0.10:
@@ -188,49 +330,213 @@ def ahp():
     last = AhpResult.query.order_by(AhpResult.created_at.desc()).first()
     last_weights = json.loads(last.weights_json) if last else None
 
-    return render_template("ahp.html", criteria=criteria, current=current, last=last, last_weights=last_weights)
+    return render_template(
+        "ahp.html", criteria=criteria, current=current, last=last, last_weights=last_weights,
+        methods=AHP.METHODS, method=current_app.config["AHP_WEIGHT_METHOD"],
+        evaluators=list_evaluators(), group_modes=GroupAHP.MODES,
+    )
+
+@bp.post("/ahp/group")
+def ahp_group():
+    """Agregasikan penilaian semua penilai (AIJ / AIP) menjadi bobot AHP baru."""
+    try:
+        raw_max_cr = request.form.get("max_cr", "").strip()
+        result = run_group_ahp(
+            mode=request.form.get("mode", "aij"),
+            method=request.form.get("method") or None,
+            max_cr=float(raw_max_cr) if raw_max_cr else None,
+        )
+        flash(f"Bobot kelompok dihitung dari {result['raters']} penilai. CR = {result['cr']:.4f}", "success")
+        if result["excluded"]:
+            flash(f"{len(result['excluded'])} penilai dilewati karena CR di atas batas.", "info")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Gagal menghitung AHP kelompok: {e}", "danger")
+    return redirect(url_for("main.ahp"))
+
+@bp.post("/ahp/evaluators/<int:eid>/delete")
+def ahp_evaluator_delete(eid: int):
+    if remove_evaluator(eid):
+        flash("Penilai dihapus.", "info")
+    else:
+        flash("Penilai tidak ditemukan.", "warning")
+    return redirect(url_for("main.ahp"))
 
 @bp.get("/results")
 def results():
-    if not _guard_non_dummy():
-        return redirect(url_for("main.index"))
+    method = request.args.get("method")
+    if method not in MCDM_METHODS:
+        method = None
+    try:
+        with timed("ranking"):
+            ranking = get_ranking(method)
+    except RankingUnavailable as e:
+        flash(str(e), "warning")
+        return redirect(url_for(e.endpoint))
 
-    criteria = Criterion.query.order_by(Criterion.id).all()
-    alternatives = Alternative.query.order_by(Alternative.id).all()
+    brand = request.args.get("brand") or None
+    sport = request.args.get("sport") or None
+    q = request.args.get("q", "").strip() or None
+    sort = request.args.get("sort", "rank")
+    if sort not in SORTS:
+        sort = "rank"
+    top = max(0, request.args.get("top", 0, type=int))
 
-    last = AhpResult.query.order_by(AhpResult.created_at.desc()).first()
-    if not last:
-        flash("Anda belum menjalankan AHP untuk menghasilkan bobot kriteria.", "warning")
-        return redirect(url_for("main.ahp"))
-
-    weights_map = json.loads(last.weights_json)
-    weights = np.array([weights_map[str(c.id)] if isinstance(next(iter(weights_map.keys())), str) else weights_map[c.id] for c in criteria], dtype=float)
-
-    # decision matrix
-    m = len(alternatives); n = len(criteria)
-    decision = np.zeros((m, n), dtype=float)
-    for ai, alt in enumerate(alternatives):
-        for ci, crit in enumerate(criteria):
-            v = AlternativeValue.query.filter_by(alternative_id=alt.id, criterion_id=crit.id).first()
-            decision[ai, ci] = v.value
-
-    # ideal profile: benefit -> max, cost -> min
-    ideal = []
-    for ci, crit in enumerate(criteria):
-        col = decision[:, ci]
-        ideal.append(float(col.max()) if crit.ctype == "benefit" else float(col.min()))
-    ideal = np.array(ideal, dtype=float)
-
-    # profile matching: use gap to ideal then convert to score
-    # We'll transform: score = 1 / (1 + abs(gap))  (simple, monotonic), then weighted sum.
-    gaps = decision - ideal
-    scores = 1.0 / (1.0 + np.abs(gaps))
-    final = scores.dot(weights)
-
-    ranked = sorted(
-        [{"name": a.name, "brand": a.brand, "sport": a.sport, "score": float(final[i]), "source_url": a.source_url} for i, a in enumerate(alternatives)],
-        key=lambda x: x["score"],
-        reverse=True,
+    with timed("select"):
+        idx = ranking.select(brand=brand, sport=sport, q=q)
+        if top:
+            idx = ranking.top_k(top, idx)
+        idx = ranking.sorted(idx, sort)
+
+        page = Page(request.args.get("page", 1, type=int), _per_page(), len(idx))
+        ranked = ranking.rows(idx[page.start:page.end])
+
+    return render_template(
+        "results.html", ranked=ranked, page=page, args=_page_args(), facets=ranking.facets(), sorts=SORTS,
+        criteria=ranking.criteria, weights=ranking.weights, cr=ranking.cr, total=len(ranking),
+        methods=MCDM_METHODS, method=MCDM_METHODS[ranking.method],
+    )
+
+@bp.get("/alternatives/<int:aid>/similar")
+def alternative_similar(aid: int):
+    """Sepatu serupa: k tetangga terdekat, opsional dibatasi sport/brand yang sama."""
+    try:
+        index = get_similarity_index()
+    except RankingUnavailable as e:
+        flash(str(e), "warning")
+        return redirect(url_for(e.endpoint))
+    row = index.row_of(aid)
+    if row is None:
+        flash("Alternatif tidak ditemukan.", "warning")
+        return redirect(url_for("main.results"))
+
+    k = min(max(1, request.args.get("k", 10, type=int)), current_app.config["SIMILAR_MAX_K"])
+    same = request.args.get("same")
+    if same not in SEGMENTS:
+        same = None
+    filters = {same: (index.sports if same == "sport" else index.brands)[row]} if same else {}
+    with timed("similar"):
+        neighbors = index.nearest(aid, k, **filters)
+    return render_template(
+        "similar.html", alt={"id": aid, "name": index.names[row], "brand": index.brands[row] or None,
+                             "sport": index.sports[row] or None},
+        neighbors=neighbors, k=k, same=same, choices=SEGMENTS,
     )
 
-    return render_template("results.html", ranked=ranked, criteria=criteria, alternatives=alternatives, weights=weights, cr=last.cr)
+@bp.get("/results/segments")
+def results_segments():
+    """Ranking terpisah per olahraga / brand, masing-masing dengan profil ideal dan top-K sendiri."""
+    by = request.args.get("by", "sport")
+    if by not in SEGMENTS:
+        by = "sport"
+    top = max(0, request.args.get("top", 5, type=int))
+    try:
+        with timed("ranking"):
+            seg = get_segmented_ranking(by)
+    except RankingUnavailable as e:
+        flash(str(e), "warning")
+        return redirect(url_for(e.endpoint))
+
+    return render_template(
+        "segments.html", segments=seg.segments(top), by=by, top=top, choices=SEGMENTS,
+        criteria=seg.criteria, total=len(seg.ids),
+    )
+
+@bp.route("/scenarios", methods=["GET","POST"])
+@json_request
+def scenarios():
+    """
+    Ranking untuk banyak skenario bobot sekaligus.
+    GET  /scenarios?ahp=<id>&ahp=<id>&top=10
+    POST JSON {"weights": [[...] | {criterion_id: w}], "ahp_result_ids": [...], "labels": [...], "top": 10, "baseline": 0}
+    """
+    import numpy as np
+    body = g.body
+    ahp_ids = body.get("ahp_result_ids") or request.args.getlist("ahp", type=int)
+    raw_weights = body.get("weights") or []
+
+    matrix = load_decision_matrix()
+    if not matrix.criteria or not matrix.alternatives or not matrix.complete:
+        return jsonify(error="Data kriteria/alternatif belum lengkap."), 409
+    criteria = matrix.criteria
+
+    vectors, labels = [], []
+    try:
+        top = int(body.get("top", request.args.get("top", 10, type=int)))
+        baseline = int(body.get("baseline", request.args.get("baseline", 0, type=int)))
+        if ahp_ids:
+            found = {r.id: r for r in AhpResult.query.filter(AhpResult.id.in_(ahp_ids))}
+            for rid in ahp_ids:
+                if rid not in found:
+                    return jsonify(error=f"AhpResult {rid} tidak ditemukan."), 404
+                vectors.append(weights_vector(json.loads(found[rid].weights_json), criteria))
+                labels.append(f"ahp:{rid}")
+        for k, w in enumerate(raw_weights):
+            if isinstance(w, dict):
+                w = [w[str(c.id)] for c in criteria]
+            vectors.append(np.asarray(w, dtype=float))
+            labels.append(f"w:{k}")
+        if body.get("labels"):
+            labels = list(body["labels"])
+            if len(labels) != len(vectors):
+                raise ValueError(f"labels harus berisi {len(vectors)} nama (satu per vektor bobot).")
+        if not vectors:
+            return jsonify(error="Berikan minimal satu vektor bobot atau id AhpResult."), 400
+
+        result = ScenarioAnalysis.calculate(
+            matrix.gap_scores(), np.vstack(vectors), [a.name for a in matrix.alternatives],
+            labels=labels, top_k=top, baseline=baseline,
+        )
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify(error=f"Skenario tidak valid: {e}"), 400
+
+    for scenario in result["scenarios"]:
+        for row in scenario["top"] + scenario["movers"]:
+            row["id"] = int(matrix.alt_ids[row.pop("index")])
+    return jsonify(result)
+
+@bp.get("/sensitivity")
+def sensitivity():
+    """
+    Stabilitas ranking terhadap gangguan bobot AHP terakhir (Monte Carlo).
+    GET /sensitivity?samples=5000&mode=dirichlet|jitter&concentration=100&jitter=0.1&top=10&bins=10&seed=0
+    Tambahkan &async=1 untuk menjalankannya sebagai job (202 + URL status).
+    """
+    try:
+        params = sensitivity_params(request.args, current_app.config["SENSITIVITY_MAX_SAMPLES"])
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    if request.args.get("async"):
+        job = submit_job(current_app._get_current_object(), "sensitivity", params)
+        return jsonify(job=job.id, status_url=url_for("api.job_detail", jid=job.id)), 202
+
+    try:
+        result = sensitivity_report(params, workers=current_app.config["SENSITIVITY_WORKERS"])
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    if result is None:
+        return jsonify(error="Data alternatif belum lengkap atau AHP belum dijalankan."), 409
+    return jsonify(result)
+
+@bp.get("/history")
+def history():
+    """Riwayat snapshot ranking + perbandingan dua snapshot (?from=<id>&to=<id>&top=K)."""
+    snapshots = list_snapshots(limit=100)
+    top = max(1, request.args.get("top", 10, type=int))
+    diff = None
+    a_id, b_id = request.args.get("from", type=int), request.args.get("to", type=int)
+    if a_id and b_id:
+        a, b = load_snapshot(a_id), load_snapshot(b_id)
+        if a is None or b is None:
+            flash("Snapshot tidak ditemukan.", "warning")
+        else:
+            diff = diff_snapshots(a[1], b[1], top_k=top, movers=top)
+            diff["from"], diff["to"] = a[0], b[0]
+    return render_template("history.html", snapshots=snapshots, diff=diff, top=top)
+
+@bp.get("/jobs")
+def jobs():
+    expire_stale_jobs()
+    items = Job.query.order_by(Job.id.desc()).limit(50).all()
+    return render_template("jobs.html", items=items)
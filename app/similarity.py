@@ -0,0 +1,177 @@
+"""
+similarity.py - Indeks "sepatu serupa" (k tetangga terdekat) atas matriks keputusan
+
+Setiap alternatif menjadi vektor nilai ternormalisasi min-max per kriteria
+(0..1, dari statistik kolom store matriks), dikali akar bobot AHP, sehingga
+jarak Euclid = sqrt(Σ_j w_j (z_aj - z_bj)^2). Kemiripan = 1 - jarak / sqrt(Σ w)
+(1 = identik, 0 = berseberangan di semua kriteria).
+
+Query memakai pencarian blok tervektorisasi: jarak dihitung per blok baris
+(||e||^2 + ||q||^2 - 2 E q), top-k tiap blok dengan argpartition lalu
+digabung. Filter sport/brand hanya memindai baris segmen tersebut (baris
+dikelompokkan per segmen saat indeks dibangun).
+
+Indeks di-cache per versi data (nilai atau bobot berubah -> indeks baru).
+Matriks ternormalisasi tanpa bobot di-cache per versi matriks, jadi run AHP
+baru hanya menskala ulang kolom; perubahan nilai memakai store matriks yang
+sudah diperbarui inkremental.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from flask import current_app
+
+from .cache import _local_get, _local_put, cached, current_matrix_version
+from .methods.segmented import segment_codes
+from .profiling import timed
+from .ranking import get_decision_inputs
+
+if TYPE_CHECKING:
+    import numpy as np
+
+BASE_KEY = "similarity_base"
+
+
+def normalized_matrix(matrix) -> np.ndarray:
+    """Nilai min-max per kriteria (0..1, kolom konstan -> 0), float32; min/max dari statistik store."""
+    import numpy as np
+    stats = matrix.stats()
+    col_min = stats["min"]
+    span = stats["max"] - col_min
+    z = np.divide(matrix.values - col_min, span, out=np.zeros(matrix.values.shape), where=span > 0)
+    return z.astype(np.float32)
+
+
+class SimilarityIndex:
+    """Embedding berbobot (m x n) + pengelompokan baris per sport dan brand."""
+
+    def __init__(self, alternatives, normalized: np.ndarray, weights: np.ndarray, block_size: int = 65536):
+        import numpy as np
+        self.ids = np.array([a.id for a in alternatives], dtype=np.int64)
+        self.names = np.array([a.name for a in alternatives], dtype=object)
+        self.brands = np.array([a.brand or "" for a in alternatives], dtype=object)
+        self.sports = np.array([a.sport or "" for a in alternatives], dtype=object)
+        self.block_size = max(1, int(block_size))
+
+        weights = np.clip(np.asarray(weights, dtype=float), 0.0, None)
+        self.max_distance = float(np.sqrt(weights.sum())) or 1.0
+        self.embedding = np.ascontiguousarray(normalized * np.sqrt(weights).astype(np.float32))
+        self.sq_norms = np.einsum("ij,ij->i", self.embedding, self.embedding)
+
+        # per facet: label unik, lalu baris dikelompokkan per label (order[starts[g]:starts[g+1]])
+        self.facets = {}
+        for facet, labels in (("sport", self.sports), ("brand", self.brands)):
+            uniq, codes = segment_codes(labels)
+            order = np.argsort(codes, kind="stable")
+            starts = np.searchsorted(codes[order], np.arange(uniq.size + 1))
+            self.facets[facet] = (uniq, codes, order, starts)
+
+    def __len__(self):
+        return int(self.ids.size)
+
+    def row_of(self, alt_id: int):
+        import numpy as np
+        k = int(np.searchsorted(self.ids, alt_id))
+        return k if k < self.ids.size and self.ids[k] == alt_id else None
+
+    def candidates(self, sport: str = None, brand: str = None):
+        """Baris yang lolos filter (None = semua baris); segmen terkecil dipindai, lainnya disaring kode."""
+        import numpy as np
+        chosen = []
+        for facet, label in (("sport", sport), ("brand", brand)):
+            if label is None:
+                continue
+            uniq, codes, order, starts = self.facets[facet]
+            g = int(np.searchsorted(uniq, label))
+            if g >= uniq.size or uniq[g] != label:
+                return np.empty(0, dtype=np.int64)
+            chosen.append((starts[g + 1] - starts[g], facet, g))
+        if not chosen:
+            return None
+        chosen.sort()
+        _, facet, g = chosen[0]
+        uniq, codes, order, starts = self.facets[facet]
+        rows = order[starts[g]:starts[g + 1]]
+        for _, facet, g in chosen[1:]:
+            rows = rows[self.facets[facet][1][rows] == g]
+        return np.sort(rows)
+
+    def _block_topk(self, q: np.ndarray, rows, lo: int, hi: int, k: int):
+        """Top-k (jarak^2, baris) dalam satu blok."""
+        import numpy as np
+        sel = slice(lo, hi) if rows is None else rows[lo:hi]
+        block = self.embedding[sel]
+        d2 = self.sq_norms[sel] + float(q @ q) - 2.0 * (block @ q)
+        idx = np.arange(lo, hi) if rows is None else rows[lo:hi]
+        if k < d2.size:
+            part = np.argpartition(d2, k - 1)[:k]
+            d2, idx = d2[part], idx[part]
+        return d2, idx
+
+    def nearest(self, alt_id: int, k: int = 10, sport: str = None, brand: str = None):
+        """
+        k alternatif terdekat ke `alt_id` (tidak termasuk dirinya), urut jarak lalu id.
+        KeyError bila alt_id tidak ada di indeks.
+        """
+        import numpy as np
+        row = self.row_of(alt_id)
+        if row is None:
+            raise KeyError(alt_id)
+        rows = self.candidates(sport=sport, brand=brand)
+        total = len(self) if rows is None else rows.size
+        if k <= 0 or total == 0:
+            return []
+        q = self.embedding[row]
+        # +1 agar alternatif itu sendiri bisa dibuang tanpa kehilangan tetangga
+        want = k + 1
+        parts = [self._block_topk(q, rows, lo, min(lo + self.block_size, total), want)
+                 for lo in range(0, total, self.block_size)]
+        d2 = np.concatenate([p[0] for p in parts])
+        idx = np.concatenate([p[1] for p in parts])
+        keep = idx != row
+        d2, idx = d2[keep], idx[keep]
+        if k < d2.size:
+            part = np.argpartition(d2, k - 1)[:k]
+            d2, idx = d2[part], idx[part]
+        order = np.lexsort((self.ids[idx], d2))
+        dist = np.sqrt(np.maximum(d2[order], 0.0))
+        return [
+            {
+                "id": int(self.ids[i]),
+                "name": self.names[i],
+                "brand": self.brands[i] or None,
+                "sport": self.sports[i] or None,
+                "distance": float(d),
+                "similarity": float(max(0.0, 1.0 - d / self.max_distance)),
+            }
+            for i, d in zip(idx[order], dist)
+        ]
+
+
+def _normalized_base(matrix):
+    """Matriks ternormalisasi tanpa bobot untuk versi matriks saat ini (cache proses)."""
+    version = current_matrix_version()
+    base = _local_get(BASE_KEY, version)
+    if base is None:
+        base = normalized_matrix(matrix)
+        _local_put(BASE_KEY, version, base)
+    return base
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """
+    Indeks untuk versi data saat ini (cache per proses, tidak dipickle ke tabel).
+    RankingUnavailable bila data belum lengkap / AHP belum dijalankan.
+    """
+    def compute():
+        inputs = get_decision_inputs()
+        matrix = inputs.matrix
+        with timed("similarity"):
+            return SimilarityIndex(
+                matrix.alternatives, _normalized_base(matrix), inputs.weights,
+                block_size=current_app.config.get("SIMILAR_BLOCK_SIZE", 65536),
+            )
+
+    return cached("similarity", compute, persist=False)
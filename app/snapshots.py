@@ -0,0 +1,183 @@
+"""
+snapshots.py - Snapshot ranking termaterialisasi + diff antar snapshot
+
+Satu snapshot ditulis untuk setiap (versi data, metode) saat ranking
+dihitung; setiap run AHP langsung memicu satu snapshot. Skor dan peringkat
+disimpan sebagai array biner terkemas (int32 ids, float32 scores, int32
+ranks; little-endian, urut id), bukan satu baris ORM per alternatif.
+Melihat dan membandingkan riwayat hanya membaca snapshot (+ nama alternatif
+yang ditampilkan), tanpa menyentuh alternative_values.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from . import db
+from .models import Alternative, RankingSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotArrays:
+    """Array snapshot yang sudah dibongkar; semua urut id."""
+
+    def __init__(self, row):
+        import numpy as np
+        self.id = row.id
+        self.ids = np.frombuffer(row.ids, dtype="<i4")
+        self.scores = np.frombuffer(row.scores, dtype="<f4")
+        self.ranks = np.frombuffer(row.ranks, dtype="<i4")
+
+    def top_ids(self, k: int):
+        return self.ids[self.ranks <= k]
+
+
+def write_snapshot(ranking, data_version: int):
+    """Simpan Ranking sebagai snapshot (sekali per versi data + metode)."""
+    stmt = insert(RankingSnapshot.__table__).values(
+        data_version=data_version,
+        method=ranking.method,
+        ahp_result_id=ranking.ahp_result_id,
+        cr=ranking.cr,
+        n=len(ranking),
+        ids=ranking.ids.astype("<i4").tobytes(),
+        scores=ranking.scores.astype("<f4").tobytes(),
+        ranks=ranking.rank.astype("<i4").tobytes(),
+    ).on_conflict_do_nothing(index_elements=["data_version", "method"])
+    try:
+        db.session.execute(stmt)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning("Gagal menyimpan snapshot ranking v%s: %s", data_version, e)
+
+
+def snapshot_info(row) -> dict:
+    return {
+        "id": row.id,
+        "data_version": row.data_version,
+        "method": row.method,
+        "ahp_result_id": row.ahp_result_id,
+        "cr": row.cr,
+        "n": row.n,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+def list_snapshots(limit: int = 50, method: str = None):
+    """Metadata snapshot terbaru (tanpa kolom biner)."""
+    query = select(
+        RankingSnapshot.id, RankingSnapshot.data_version, RankingSnapshot.method, RankingSnapshot.ahp_result_id,
+        RankingSnapshot.cr, RankingSnapshot.n, RankingSnapshot.created_at,
+    ).order_by(RankingSnapshot.id.desc()).limit(limit)
+    if method:
+        query = query.where(RankingSnapshot.method == method)
+    return [snapshot_info(r) for r in db.session.execute(query)]
+
+
+def load_snapshot(snapshot_id: int):
+    """(metadata, SnapshotArrays) atau None."""
+    row = db.session.get(RankingSnapshot, snapshot_id)
+    if row is None:
+        return None
+    return snapshot_info(row), SnapshotArrays(row)
+
+
+def alternative_names(ids) -> dict:
+    """{id: name} hanya untuk id yang akan ditampilkan."""
+    ids = [int(i) for i in ids]
+    if not ids:
+        return {}
+    return dict(db.session.execute(select(Alternative.id, Alternative.name).where(Alternative.id.in_(ids))).all())
+
+
+def snapshot_rows(snap: SnapshotArrays, k: int):
+    """K peringkat teratas sebuah snapshot, siap-render."""
+    import numpy as np
+    idx = np.flatnonzero(snap.ranks <= k) if k > 0 else np.arange(snap.ids.size)
+    idx = idx[np.argsort(snap.ranks[idx], kind="stable")]
+    names = alternative_names(snap.ids[idx])
+    return [
+        {"id": int(snap.ids[i]), "name": names.get(int(snap.ids[i])), "rank": int(snap.ranks[i]), "score": float(snap.scores[i])}
+        for i in idx
+    ]
+
+
+def _rank_in(snap: SnapshotArrays, ids):
+    """Peringkat `ids` di snapshot (0 bila tidak ada)."""
+    import numpy as np
+    ids = np.asarray(ids, dtype=np.int64)
+    if snap.ids.size == 0 or ids.size == 0:
+        return np.zeros(ids.size, dtype=np.int64)
+    pos = np.minimum(np.searchsorted(snap.ids, ids), snap.ids.size - 1)
+    return np.where(snap.ids[pos] == ids, snap.ranks[pos], 0)
+
+
+def diff_snapshots(a: SnapshotArrays, b: SnapshotArrays, top_k: int = 10, movers: int = 10) -> dict:
+    """
+    Bandingkan snapshot a (lama) dengan b (baru), seluruhnya dengan operasi array:
+      - movers      : perubahan peringkat terbesar (|rank_a - rank_b|) di antara alternatif yang ada di keduanya
+      - entered     : masuk top-K di b, tidak di a
+      - exited      : ada di top-K a, keluar di b
+      - added/removed : alternatif yang hanya ada di salah satu snapshot
+      - rank_correlation : Spearman atas alternatif bersama (peringkat ulang di dalam irisan)
+    """
+    import numpy as np
+    common, ia, ib = np.intersect1d(a.ids, b.ids, assume_unique=True, return_indices=True)
+    ra, rb = a.ranks[ia].astype(np.int64), b.ranks[ib].astype(np.int64)
+    delta = ra - rb  # positif = naik peringkat
+
+    mover_idx = np.empty(0, dtype=np.int64)
+    if movers > 0 and common.size:
+        magnitude = np.abs(delta)
+        if movers < common.size:
+            mover_idx = np.argpartition(-magnitude, movers - 1)[:movers]
+        else:
+            mover_idx = np.arange(common.size)
+        mover_idx = mover_idx[np.lexsort((rb[mover_idx], -magnitude[mover_idx]))]
+        mover_idx = mover_idx[delta[mover_idx] != 0]
+
+    a_top, b_top = a.top_ids(top_k), b.top_ids(top_k)
+    entered = np.setdiff1d(b_top, a_top, assume_unique=True)
+    exited = np.setdiff1d(a_top, b_top, assume_unique=True)
+    added = np.setdiff1d(b.ids, a.ids, assume_unique=True)
+    removed = np.setdiff1d(a.ids, b.ids, assume_unique=True)
+
+    correlation = None
+    n = common.size
+    if n > 1:
+        # peringkat ulang di dalam irisan agar rumus Spearman berlaku
+        pa = np.empty(n, dtype=np.float64)
+        pb = np.empty(n, dtype=np.float64)
+        pa[np.argsort(ra, kind="stable")] = np.arange(n)
+        pb[np.argsort(rb, kind="stable")] = np.arange(n)
+        correlation = float(1 - 6 * ((pa - pb) ** 2).sum() / (n * (n ** 2 - 1)))
+
+    shown = np.concatenate([common[mover_idx], entered, exited])
+    names = alternative_names(np.unique(shown))
+
+    def rows(ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        before, after = _rank_in(a, ids), _rank_in(b, ids)
+        return [
+            {"id": int(i), "name": names.get(int(i)), "rank_from": int(x) or None, "rank_to": int(y) or None}
+            for i, x, y in zip(ids, before, after)
+        ]
+
+    return {
+        "common": int(n),
+        "rank_correlation": correlation,
+        "movers": [
+            {"id": int(common[i]), "name": names.get(int(common[i])), "rank_from": int(ra[i]), "rank_to": int(rb[i]), "delta": int(delta[i])}
+            for i in mover_idx
+        ],
+        "top_k": top_k,
+        "entered": rows(entered[np.argsort(_rank_in(b, entered), kind="stable")]),
+        "exited": rows(exited[np.argsort(_rank_in(a, exited), kind="stable")]),
+        "added": added.astype(int).tolist(),
+        "removed": removed.astype(int).tolist(),
+    }
@@ -0,0 +1,372 @@
+"""
+store.py - Store matriks keputusan ternormalisasi (gap score) + statistik kriteria
+
+Store berisi matriks nilai, statistik per kriteria (count/sum/min/max ->
+min/max/mean/std), profil ideal dan matriks gap score. Disimpan di database:
+header (kriteria, statistik, ideal) di tabel matrix_store, baris alternatif
+per blok id (alternative_id // block_size) di matrix_store_blocks. Store
+valid untuk satu versi matriks (lihat cache.current_matrix_version).
+Setiap blok mencatat versi matriks saat terakhir ditulis; worker yang sudah
+punya store versi lebih lama hanya membaca blok yang ditulis sesudahnya.
+
+Perubahan kecil diterapkan inkremental oleh update_store(), dalam transaksi
+yang sama dengan perubahan datanya:
+  - nilai sel berubah / alternatif ditambah / dihapus: hanya baris terkait
+    yang dihitung ulang dan hanya blok terkait yang ditulis;
+  - kolom dihitung ulang (dan semua blok ditulis) hanya bila nilai
+    ekstremnya, yaitu profil ideal, ikut berubah.
+Perubahan besar (kriteria, import katalog) tidak memanggil update_store();
+store menjadi basi dan dibangun ulang penuh saat dibaca berikutnya.
+Ranking tetap dihitung ulang atas seluruh store, O(m x n) per versi.
+"""
+
+from __future__ import annotations
+
+import logging
+import pickle
+import threading
+from typing import TYPE_CHECKING
+
+from flask import current_app
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session
+
+from . import db
+from .cache import _local_get, _local_put, current_matrix_version
+from .matrix import ALTERNATIVE_COLUMNS, DecisionMatrix, load_decision_matrix
+from .methods import ProfileMatching
+from .models import Alternative, MatrixStoreHeader, MatrixStoreBlock
+from .profiling import timed
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STORE_KEY = "matrix_store"
+_PENDING = "spk_pending_store"
+
+# store terbaru per database di proses ini (versi, store), dasar pembacaan inkremental
+_latest = {}
+_latest_lock = threading.Lock()
+
+
+class MatrixStore(DecisionMatrix):
+    """
+    DecisionMatrix (urut id) dengan statistik kolom dan gap score yang sudah
+    dihitung; ideal_profile() / gap_scores() tidak menghitung ulang.
+    """
+
+    def __init__(self, criteria, alternatives, values, present, block_size: int, stats=None, gap=None):
+        import numpy as np
+        super().__init__(criteria, alternatives, values, present)
+        self.block_size = int(block_size)
+        if stats is None:
+            masked = np.where(present, values, 0.0)
+            stats = {
+                "count": present.sum(axis=0).astype(np.int64),
+                "total": masked.sum(axis=0),
+                "total_sq": (masked ** 2).sum(axis=0),
+            }
+            stats["col_min"], stats["col_max"] = self._extremes(slice(None))
+        self.count = stats["count"]
+        self.total = stats["total"]
+        self.total_sq = stats["total_sq"]
+        self.col_min = stats["col_min"]
+        self.col_max = stats["col_max"]
+        self.ideal = np.where(self.is_benefit, self.col_max, self.col_min)
+        self.gap = ProfileMatching.gap_scores(values, self.ideal) if gap is None else gap
+
+    @classmethod
+    def from_matrix(cls, matrix: DecisionMatrix, block_size: int):
+        return cls(matrix.criteria, matrix.alternatives, matrix.values, matrix.present, block_size)
+
+    def ideal_profile(self) -> np.ndarray:
+        return self.ideal
+
+    def gap_scores(self) -> np.ndarray:
+        return self.gap
+
+    def stats(self) -> dict:
+        """Statistik per kriteria atas sel yang terisi: min, max, mean, std (populasi)."""
+        import numpy as np
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self.total / self.count
+            var = np.maximum(self.total_sq / self.count - mean ** 2, 0.0)
+        return {"count": self.count, "min": self.col_min, "max": self.col_max, "mean": mean, "std": np.sqrt(var)}
+
+    def copy(self):
+        return MatrixStore(
+            self.criteria, list(self.alternatives), self.values.copy(), self.present.copy(), self.block_size,
+            stats={k: getattr(self, k).copy() for k in ("count", "total", "total_sq", "col_min", "col_max")},
+            gap=self.gap.copy(),
+        )
+
+    # ---- pembaruan inkremental ----
+    # Setiap metode mengembalikan (id alternatif yang barisnya berubah, semua_baris_berubah).
+
+    def _extremes(self, cols):
+        """Min/max kolom atas sel yang terisi (NaN untuk kolom kosong)."""
+        import numpy as np
+        vals, pres = self.values[:, cols], self.present[:, cols]
+        has = pres.any(axis=0)
+        col_min = np.where(has, np.where(pres, vals, np.inf).min(axis=0, initial=np.inf), np.nan)
+        col_max = np.where(has, np.where(pres, vals, -np.inf).max(axis=0, initial=-np.inf), np.nan)
+        return col_min, col_max
+
+    def _rescore(self, rows: np.ndarray, cols: np.ndarray) -> bool:
+        """Hitung ulang statistik ekstrem `cols`, lalu gap baris `rows` + kolom yang idealnya berubah."""
+        import numpy as np
+        if cols.size:
+            self.col_min[cols], self.col_max[cols] = self._extremes(cols)
+        ideal = np.where(self.is_benefit, self.col_max, self.col_min)
+        moved = np.flatnonzero(~((ideal == self.ideal) | (np.isnan(ideal) & np.isnan(self.ideal))))
+        self.ideal = ideal
+        if rows.size:
+            self.gap[rows] = ProfileMatching.gap_scores(self.values[rows], ideal)
+        if moved.size:
+            self.gap[:, moved] = ProfileMatching.gap_scores(self.values[:, moved], ideal[moved])
+        return bool(moved.size)
+
+    def _rows_of(self, alt_ids) -> np.ndarray:
+        import numpy as np
+        alt_ids = np.asarray(alt_ids, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.alt_ids, alt_ids), max(len(self.alt_ids) - 1, 0))
+        if not len(self.alt_ids) or not (self.alt_ids[pos] == alt_ids).all():
+            raise KeyError("Alternatif tidak ada di store")
+        return pos
+
+    def _reindexed(self):
+        for attr in ("alt_index", "crit_index"):
+            self.__dict__.pop(attr, None)
+
+    def set_values(self, alt_ids, crit_ids, new_values):
+        """Set sel (alt_id, crit_id) -> nilai; pasangan sel harus unik."""
+        import numpy as np
+        i = self._rows_of(alt_ids)
+        j = np.searchsorted(self.crit_ids, np.asarray(crit_ids, dtype=np.int64))
+        v = np.asarray(new_values, dtype=float)
+        old, had = self.values[i, j], self.present[i, j]
+
+        np.add.at(self.count, j, (~had).astype(np.int64))
+        np.add.at(self.total, j, v - np.where(had, old, 0.0))
+        np.add.at(self.total_sq, j, v ** 2 - np.where(had, old, 0.0) ** 2)
+
+        # ekstrem lama yang bergeser ke dalam -> kolom perlu dihitung ulang
+        stale = np.zeros(len(self.crit_ids), dtype=bool)
+        np.logical_or.at(stale, j, had & (((old == self.col_max[j]) & (v < old)) | ((old == self.col_min[j]) & (v > old))))
+        np.fmax.at(self.col_max, j, v)
+        np.fmin.at(self.col_min, j, v)
+
+        self.values[i, j] = v
+        self.present[i, j] = True
+        rows = np.unique(i)
+        return self.alt_ids[rows], self._rescore(rows, np.flatnonzero(stale))
+
+    def add_alternative(self, row):
+        """Sisipkan alternatif baru (belum punya nilai) sesuai urutan id."""
+        import numpy as np
+        k = int(np.searchsorted(self.alt_ids, row.id))
+        n = len(self.crit_ids)
+        self.alternatives.insert(k, row)
+        self.alt_ids = np.insert(self.alt_ids, k, row.id)
+        self.values = np.insert(self.values, k, np.full(n, np.nan), axis=0)
+        self.present = np.insert(self.present, k, np.zeros(n, dtype=bool), axis=0)
+        self.gap = np.insert(self.gap, k, np.full(n, np.nan), axis=0)
+        self._reindexed()
+        return np.array([row.id], dtype=np.int64), False
+
+    def remove_alternatives(self, alt_ids):
+        import numpy as np
+        rows = np.unique(self._rows_of(alt_ids))
+        vals, pres = self.values[rows], self.present[rows]
+        masked = np.where(pres, vals, 0.0)
+        self.count -= pres.sum(axis=0)
+        self.total -= masked.sum(axis=0)
+        self.total_sq -= (masked ** 2).sum(axis=0)
+        stale = (pres & ((vals == self.col_max) | (vals == self.col_min))).any(axis=0)
+
+        removed = self.alt_ids[rows]
+        keep = np.ones(len(self.alt_ids), dtype=bool)
+        keep[rows] = False
+        self.alternatives = [a for a, k in zip(self.alternatives, keep) if k]
+        self.alt_ids = self.alt_ids[keep]
+        self.values = self.values[keep]
+        self.present = self.present[keep]
+        self.gap = self.gap[keep]
+        self._reindexed()
+        return removed, self._rescore(np.empty(0, dtype=np.int64), np.flatnonzero(stale))
+
+    # ---- serialisasi per blok ----
+
+    def block_ids(self, alt_ids=None) -> np.ndarray:
+        import numpy as np
+        return np.unique((self.alt_ids if alt_ids is None else np.asarray(alt_ids)) // self.block_size)
+
+    def block_rows(self, block: int):
+        """Baris blok `block` (None bila kosong)."""
+        import numpy as np
+        lo, hi = np.searchsorted(self.alt_ids, [block * self.block_size, (block + 1) * self.block_size])
+        if lo == hi:
+            return None
+        return {
+            "alternatives": self.alternatives[lo:hi],
+            "values": self.values[lo:hi],
+            "present": self.present[lo:hi],
+            "gap": self.gap[lo:hi],
+        }
+
+    def block_payload(self, block: int):
+        rows = self.block_rows(block)
+        return None if rows is None else pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def header_payload(self):
+        return pickle.dumps({
+            "criteria": self.criteria,
+            "count": self.count, "total": self.total, "total_sq": self.total_sq,
+            "col_min": self.col_min, "col_max": self.col_max,
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _latest_store():
+    """(versi, store) terbaru yang pernah dipakai proses ini untuk database aktif, atau (None, None)."""
+    with _latest_lock:
+        return _latest.get(current_app.config["SQLALCHEMY_DATABASE_URI"], (None, None))
+
+
+def _remember(version: int, store: MatrixStore):
+    _local_put(STORE_KEY, version, store)
+    uri = current_app.config["SQLALCHEMY_DATABASE_URI"]
+    with _latest_lock:
+        if uri not in _latest or _latest[uri][0] < version:
+            _latest[uri] = (version, store)
+
+
+def _load(version: int, base: MatrixStore = None, base_version: int = None):
+    """
+    Store dari database untuk versi matriks `version`; None bila tidak ada/basi.
+    Dengan `base` (store versi `base_version` < `version`), blok yang tidak
+    ditulis sesudah base_version diambil dari base, bukan dibaca ulang.
+    """
+    import numpy as np
+    head = db.session.execute(
+        select(MatrixStoreHeader.version, MatrixStoreHeader.block_size, MatrixStoreHeader.payload)
+        .where(MatrixStoreHeader.id == 1)
+    ).first()
+    if head is None or head.version != version:
+        return None
+    header = pickle.loads(head.payload)
+    if base is not None and (base_version >= version or base.block_size != head.block_size
+                             or list(base.crit_ids) != [c.id for c in header["criteria"]]):
+        base = None
+
+    if base is None:
+        blocks = [pickle.loads(p) for (p,) in db.session.execute(
+            select(MatrixStoreBlock.payload).order_by(MatrixStoreBlock.block)
+        )]
+    else:
+        changed = dict(db.session.execute(
+            select(MatrixStoreBlock.block, MatrixStoreBlock.payload).where(MatrixStoreBlock.version > base_version)
+        ).all())
+        blocks = []
+        for (b,) in db.session.execute(select(MatrixStoreBlock.block).order_by(MatrixStoreBlock.block)):
+            rows = pickle.loads(changed[b]) if b in changed else base.block_rows(b)
+            if rows is None:
+                # blok lama tidak ada di base: base tidak sinkron, baca penuh
+                return _load(version)
+            blocks.append(rows)
+    n = len(header["criteria"])
+    alternatives = [a for b in blocks for a in b["alternatives"]]
+
+    def stack(key, dtype):
+        return np.concatenate([b[key] for b in blocks]) if blocks else np.empty((0, n), dtype=dtype)
+
+    stats = {k: header[k] for k in ("count", "total", "total_sq", "col_min", "col_max")}
+    return MatrixStore(header["criteria"], alternatives, stack("values", float), stack("present", bool),
+                       head.block_size, stats=stats, gap=stack("gap", float))
+
+
+def _save(store: MatrixStore, version: int, blocks=None):
+    """Tulis header + blok (None = semua, ganti isi tabel) ke sesi aktif; commit oleh pemanggil."""
+    db.session.merge(MatrixStoreHeader(id=1, version=version, block_size=store.block_size, payload=store.header_payload()))
+    if blocks is None:
+        db.session.execute(delete(MatrixStoreBlock))
+        blocks = store.block_ids()
+    for b in blocks:
+        payload = store.block_payload(int(b))
+        if payload is None:
+            db.session.execute(delete(MatrixStoreBlock).where(MatrixStoreBlock.block == int(b)))
+        else:
+            db.session.merge(MatrixStoreBlock(block=int(b), version=version, payload=payload))
+
+
+def get_matrix_store() -> MatrixStore:
+    """
+    Store untuk versi matriks saat ini: cache proses -> database (hanya blok
+    yang berubah sejak store terbaru di proses ini) -> bangun ulang penuh.
+    """
+    version = current_matrix_version()
+    store = _local_get(STORE_KEY, version)
+    if store is not None:
+        return store
+
+    with timed("store"):
+        base_version, base = _latest_store()
+        store = _load(version, base, base_version)
+        if store is None:
+            store = MatrixStore.from_matrix(load_decision_matrix(), current_app.config.get("STORE_BLOCK_SIZE", 1024))
+            # hanya simpan bila matriks tidak berubah selama dibangun
+            if current_matrix_version() == version:
+                try:
+                    _save(store, version)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("Gagal menyimpan store matriks: %s", e)
+    _remember(version, store)
+    return store
+
+
+def update_store(mutate):
+    """
+    Terapkan mutate(store) -> (id alternatif berubah, semua_baris_berubah) ke
+    store versi sebelumnya. Dipanggil setelah bump_data_version() dan sebelum
+    commit. Bila store versi sebelumnya tidak tersedia, tidak melakukan apa-apa.
+    """
+    import numpy as np
+    version = current_matrix_version()
+    base = _local_get(STORE_KEY, version - 1)
+    if base is None:
+        base_version, latest = _latest_store()
+        base = _load(version - 1, latest, base_version)
+    if base is None:
+        return
+    store = base.copy()
+    try:
+        touched, all_rows = mutate(store)
+    except (KeyError, IndexError) as e:
+        # store tidak sinkron dengan data: biarkan basi, dibangun ulang saat dibaca
+        logger.warning("Store matriks tidak bisa diperbarui inkremental: %s", e)
+        return
+    blocks = None if all_rows else np.unique(np.asarray(touched, dtype=np.int64) // store.block_size)
+    _save(store, version, blocks)
+    # baru dipublikasikan ke cache proses setelah commit berhasil
+    db.session.info[_PENDING] = (version, store)
+
+
+def store_alternative(alt_id: int):
+    """Mutasi untuk update_store(): tambahkan alternatif `alt_id` (sudah di-flush)."""
+    row = db.session.execute(select(*ALTERNATIVE_COLUMNS).where(Alternative.id == alt_id)).one()
+    return lambda store: store.add_alternative(row)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session):
+    pending = session.info.pop(_PENDING, None)
+    if pending is not None:
+        _remember(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,284 @@
+"""
+bench_pipeline.py - Benchmark pipeline keputusan untuk berbagai ukuran katalog
+
+Membangkitkan dataset sintetis (Criterion / Alternative / AlternativeValue /
+Pairwise / AhpResult) di database SQLite sementara, lalu mengukur latensi,
+jumlah query SQL per panggilan dan memori puncak (tracemalloc, di pass
+terpisah agar tracing tidak ikut terukur di latensi) untuk:
+  - endpoint lewat Flask test client: /results (cold + warm), /data, /ahp GET/POST,
+    edit satu baris /data lalu /results, k tetangga terdekat (sepatu serupa)
+  - kelas metode: AHP.calculate_weights, ProfileMatching.calculate
+
+Hasil ditulis sebagai JSON agar bisa dibandingkan antar-run.
+
+Contoh:
+  python benchmarks/bench_pipeline.py --sizes 10x3,1000x15,10000x30 --out bench.json
+  python benchmarks/bench_pipeline.py --sizes 10x3,1000x15 --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import event, insert
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app, db  # noqa: E402
+from app.cache import bump_data_version  # noqa: E402
+from app.methods import AHP, ProfileMatching  # noqa: E402
+from app.models import Criterion, Alternative, AlternativeValue, Pairwise, AhpResult  # noqa: E402
+
+DEFAULT_SIZES = "10x3,100x5,1000x15,10000x30,100000x50"
+SPORTS = ["running", "basketball", "futsal", "tennis", "training", "hiking"]
+BRANDS = ["Nike", "Adidas", "ASICS", "New Balance", "Puma", "Mizuno", "Ortuseight", "Specs"]
+
+
+def parse_sizes(text: str):
+    sizes = []
+    for part in text.split(","):
+        m, n = part.lower().split("x")
+        sizes.append((int(m), int(n)))
+    return sizes
+
+
+def seed_dataset(m: int, n: int, seed: int = 0):
+    """Isi database aktif dengan m alternatif x n kriteria (lengkap + 1 hasil AHP)."""
+    rng = np.random.default_rng(seed)
+    conn = db.session.connection()
+
+    conn.execute(insert(Criterion), [
+        {"id": j + 1, "name": f"Kriteria {j + 1}", "ctype": "benefit" if j % 3 else "cost",
+         "unit": None, "source_title": "Synthetic benchmark source", "source_url": "https://example.org/c"}
+        for j in range(n)
+    ])
+    for start in range(0, m, 5000):
+        stop = min(m, start + 5000)
+        conn.execute(insert(Alternative), [
+            {"id": i + 1, "name": f"Sepatu {i + 1}", "brand": BRANDS[i % len(BRANDS)], "sport": SPORTS[i % len(SPORTS)],
+             "source_title": "Synthetic benchmark source", "source_url": f"https://example.org/a/{i + 1}"}
+            for i in range(start, stop)
+        ])
+        vals = rng.uniform(1, 100, size=(stop - start, n))
+        conn.execute(insert(AlternativeValue), [
+            {"alternative_id": i + 1, "criterion_id": j + 1, "value": float(vals[i - start, j])}
+            for i in range(start, stop) for j in range(n)
+        ])
+
+    # matriks pairwise resiprokal acak skala Saaty
+    scale = np.array([1 / 5, 1 / 3, 1, 3, 5])
+    iu = np.triu_indices(n, 1)
+    upper = scale[rng.integers(0, scale.size, size=iu[0].size)]
+    conn.execute(insert(Pairwise), [
+        {"criterion_i_id": int(i) + 1, "criterion_j_id": int(j) + 1, "value": float(v)}
+        for i, j, v in zip(iu[0], iu[1], upper)
+    ]) if n > 1 else None
+
+    A = np.ones((n, n))
+    A[iu] = upper
+    A[iu[1], iu[0]] = 1 / upper
+    weights, cr = AHP.calculate_weights(A)
+    conn.execute(insert(AhpResult), [{
+        "weights_json": json.dumps({j + 1: float(w) for j, w in enumerate(weights)}), "cr": float(cr),
+        "created_at": datetime.utcnow(),
+    }])
+    db.session.commit()
+    return {(int(i) + 1, int(j) + 1): float(v) for i, j, v in zip(iu[0], iu[1], upper)}
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def measure(fn, repeat: int, counter: QueryCounter = None, reset=None):
+    """
+    Latensi (median/min, ms) dan rata-rata query per panggilan dari `repeat`
+    panggilan tanpa tracing; memori puncak dari satu panggilan tambahan di
+    bawah tracemalloc. reset() (tidak diukur) dipanggil sebelum setiap
+    panggilan, mis. agar cache dingin lagi.
+    """
+    times = []
+    queries = 0
+    for _ in range(repeat):
+        if reset:
+            reset()
+        if counter:
+            counter.count = 0
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+        if counter:
+            queries += counter.count
+
+    if reset:
+        reset()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    out = {
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "peak_mem_kb": round(peak / 1024, 1),
+        "repeat": repeat,
+    }
+    if counter:
+        out["queries"] = round(queries / repeat, 1)
+    return out
+
+
+def bench_size(m: int, n: int, repeat: int, workdir: str):
+    path = os.path.join(workdir, f"bench_{m}x{n}.db")
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "WTF_CSRF_ENABLED": False,
+        "TESTING": True,
+    })
+    client = app.test_client()
+    result = {"alternatives": m, "criteria": n, "endpoints": {}, "methods": {}}
+
+    with app.app_context():
+        t0 = time.perf_counter()
+        pairwise = seed_dataset(m, n)
+        result["seed_seconds"] = round(time.perf_counter() - t0, 2)
+        counter = QueryCounter(db.engine)
+
+    def get(url):
+        def call():
+            r = client.get(url)
+            assert r.status_code == 200, f"{url} -> {r.status_code}"
+        return call
+
+    def make_cold():
+        # versi data + matriks baru: cache ranking, store matriks dan snapshot dihitung ulang
+        with app.app_context():
+            bump_data_version()
+            db.session.commit()
+
+    ep = result["endpoints"]
+    ep["results_cold"] = measure(get("/results"), repeat, counter, reset=make_cold)
+    ep["results_warm"] = measure(get("/results"), repeat, counter)
+    ep["results_top10"] = measure(get("/results?top=10"), repeat, counter)
+    ep["similar"] = measure(get("/api/v1/alternatives/1/similar?k=10"), repeat, counter)
+    ep["similar_same_sport"] = measure(get(f"/api/v1/alternatives/1/similar?k=10&sport={SPORTS[0]}"), repeat, counter)
+    ep["data_page"] = measure(get("/data"), repeat, counter)
+    if n >= 2:
+        ep["ahp_get"] = measure(get("/ahp"), repeat, counter)
+        form = {f"p_{i}_{j}": str(v) for (i, j), v in pairwise.items()}
+
+        def post_ahp():
+            r = client.post("/ahp", data=form)
+            assert r.status_code == 302, f"/ahp POST -> {r.status_code}"
+        ep["ahp_post"] = measure(post_ahp, repeat, counter)
+
+    # satu sel berubah lalu ranking dihitung ulang (store matriks inkremental)
+    edit_rng = np.random.default_rng(2)
+
+    def edit_then_rank():
+        form = {"alt": "1", **{f"v_1_{j + 1}": str(float(edit_rng.uniform(1, 100))) for j in range(n)}}
+        r = client.post("/data", data=form)
+        assert r.status_code == 302, f"/data POST -> {r.status_code}"
+        get("/results")()
+    ep["edit_then_results"] = measure(edit_then_rank, repeat, counter)
+
+    with app.app_context():
+        rng = np.random.default_rng(1)
+        D = rng.uniform(1, 100, size=(m, n))
+        w = np.full(n, 1.0 / n)
+        names = [f"Sepatu {i + 1}" for i in range(m)]
+        ideal = D.max(axis=0)
+        A = np.ones((n, n))
+        iu = np.triu_indices(n, 1)
+        upper = rng.choice([1 / 3, 1, 3], size=iu[0].size)
+        A[iu] = upper
+        A[iu[1], iu[0]] = 1 / upper
+
+        meth = result["methods"]
+        for method in AHP.METHODS:
+            meth[f"ahp_{method}"] = measure(lambda: AHP.calculate_weights(A, method=method), repeat)
+        meth["profile_matching_summary"] = measure(lambda: ProfileMatching.calculate(D, w, names, ideal), repeat)
+        if m * n <= 1_000_000:
+            meth["profile_matching_full"] = measure(lambda: ProfileMatching.calculate(D, w, names, ideal, detail="full"), repeat)
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    app.extensions["jobs"].shutdown(wait=False)
+    return result
+
+
+def compare(current: dict, baseline: dict, threshold: float):
+    """Cetak rasio median_ms current/baseline; tandai yang melewati threshold."""
+    base = {(r["alternatives"], r["criteria"]): r for r in baseline["runs"]}
+    regressions = 0
+    for run in current["runs"]:
+        key = (run["alternatives"], run["criteria"])
+        if key not in base:
+            continue
+        for group in ("endpoints", "methods"):
+            for name, stats in run[group].items():
+                old = base[key][group].get(name)
+                if not old or not old["median_ms"]:
+                    continue
+                ratio = stats["median_ms"] / old["median_ms"]
+                flag = "REGRESI" if ratio > threshold else ""
+                regressions += bool(flag)
+                print(f"{key[0]:>7}x{key[1]:<3} {name:<28} {old['median_ms']:>10.2f} -> {stats['median_ms']:>10.2f} ms  x{ratio:5.2f} {flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="daftar MxN dipisah koma (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="file JSON hasil run sebelumnya")
+    parser.add_argument("--threshold", type=float, default=1.25, help="rasio lambat yang dianggap regresi")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="spk-bench-")
+    runs = []
+    try:
+        for m, n in parse_sizes(args.sizes):
+            print(f"[bench] {m} alternatif x {n} kriteria ...", flush=True)
+            runs.append(bench_size(m, n, args.repeat, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "runs": runs,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] hasil ditulis ke {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        return 1 if compare(report, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+bench_startup.py - Benchmark waktu boot worker (import, create_app, request pertama)
+
+Setiap pengukuran dijalankan di proses Python baru (seperti worker gunicorn
+yang baru di-spawn) terhadap database SQLite sementara berisi katalog kecil:
+  - import_ms        : `import app`
+  - create_app_ms    : create_app() (termasuk pemeriksaan skema)
+  - first_request_ms : GET / pertama
+  - first_ranking_ms : GET /results pertama (memuat NumPy + store matriks)
+  - numeric_loaded   : apakah NumPy/pandas sudah dieksekusi sebelum request pertama
+
+Dua mode skema diukur: SCHEMA_CHECK="version" (default) dan "always".
+
+Contoh:
+  python benchmarks/bench_startup.py --repeat 7 --out startup.json
+  python benchmarks/bench_startup.py --out baru.json --compare startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# dijalankan di proses anak; mencetak satu baris JSON
+CHILD = r"""
+import json, sys, time, types
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import app
+t1 = time.perf_counter()
+application = app.create_app({"SQLALCHEMY_DATABASE_URI": sys.argv[2], "SCHEMA_CHECK": sys.argv[3]})
+t2 = time.perf_counter()
+loaded = [m for m in ("numpy", "pandas") if type(sys.modules.get(m)) is types.ModuleType]
+client = application.test_client()
+assert client.get("/").status_code == 200
+t3 = time.perf_counter()
+assert client.get("/results").status_code == 200
+t4 = time.perf_counter()
+application.extensions["jobs"].shutdown(wait=False)
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "first_ranking_ms": (t4 - t3) * 1000,
+    "numeric_loaded": loaded,
+}))
+"""
+
+METRICS = ("import_ms", "create_app_ms", "first_request_ms", "first_ranking_ms")
+
+
+def prepare_database(path: str, m: int, n: int):
+    """Isi database sementara lewat proses terpisah agar proses induk tetap bersih."""
+    code = (
+        "import sys; sys.path.insert(0, sys.argv[1]); sys.path.insert(0, sys.argv[2]);"
+        "from app import create_app;"
+        "from bench_pipeline import seed_dataset;"
+        "a = create_app({'SQLALCHEMY_DATABASE_URI': sys.argv[3]});"
+        "ctx = a.app_context(); ctx.push(); seed_dataset(int(sys.argv[4]), int(sys.argv[5]));"
+        "a.extensions['jobs'].shutdown(wait=False)"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code, ROOT, os.path.dirname(os.path.abspath(__file__)), f"sqlite:///{path}", str(m), str(n)],
+        check=True,
+    )
+
+
+def run_child(uri: str, schema_check: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, ROOT, uri, schema_check],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench_mode(uri: str, schema_check: str, repeat: int) -> dict:
+    runs = [run_child(uri, schema_check) for _ in range(repeat)]
+    result = {
+        key: {
+            "median_ms": round(statistics.median(r[key] for r in runs), 2),
+            "min_ms": round(min(r[key] for r in runs), 2),
+        }
+        for key in METRICS
+    }
+    result["boot_total_ms"] = {"median_ms": round(statistics.median(
+        sum(r[k] for k in ("import_ms", "create_app_ms", "first_request_ms")) for r in runs
+    ), 2)}
+    result["numeric_loaded"] = runs[-1]["numeric_loaded"]
+    return result
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Cetak rasio median current/baseline per mode dan metrik; return jumlah regresi."""
+    regressions = 0
+    for mode, stats in current["modes"].items():
+        old_mode = baseline.get("modes", {}).get(mode)
+        if not old_mode:
+            continue
+        for key in METRICS + ("boot_total_ms",):
+            old, new = old_mode.get(key, {}).get("median_ms"), stats[key]["median_ms"]
+            if not old:
+                continue
+            ratio = new / old
+            flag = "REGRESI" if ratio > threshold else ""
+            regressions += bool(flag)
+            print(f"{mode:<8} {key:<18} {old:>9.1f} -> {new:>9.1f} ms  x{ratio:5.2f} {flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="jumlah proses baru per mode")
+    parser.add_argument("--size", default="200x8", help="katalog MxN untuk request ranking pertama")
+    parser.add_argument("--out", default="bench_startup.json")
+    parser.add_argument("--compare", help="file JSON hasil run sebelumnya")
+    parser.add_argument("--threshold", type=float, default=1.25, help="rasio lambat yang dianggap regresi")
+    args = parser.parse_args(argv)
+
+    m, n = (int(x) for x in args.size.lower().split("x"))
+    workdir = tempfile.mkdtemp(prefix="spk-startup-")
+    try:
+        path = os.path.join(workdir, "startup.db")
+        prepare_database(path, m, n)
+        uri = f"sqlite:///{path}"
+        modes = {}
+        for mode in ("version", "always"):
+            print(f"[startup] SCHEMA_CHECK={mode} ...", flush=True)
+            modes[mode] = bench_mode(uri, mode, args.repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "size": args.size,
+        "modes": modes,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    for mode, stats in modes.items():
+        print(f"[startup] {mode:<8} " + "  ".join(f"{k}={stats[k]['median_ms']:.1f}" for k in METRICS)
+              + f"  numeric_loaded={stats['numeric_loaded']}")
+    print(f"[startup] hasil ditulis ke {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        return 1 if compare(report, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,3 +10,66 @@ class Config:
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = None
 
+    # Metode bobot AHP: normalization | eigenvector | geometric
+    AHP_WEIGHT_METHOD = "normalization"
+
+    # Metode MCDM default untuk /results: profile_matching | saw | topsis | wp
+    MCDM_DEFAULT_METHOD = "profile_matching"
+
+    # Cache ranking (per proses + tabel ranking_cache di SQLite)
+    RANKING_CACHE_LOCAL_SIZE = 32
+    RANKING_CACHE_MAX_ENTRIES = 128
+    RANKING_CACHE_TOUCH_INTERVAL = 60  # detik; last_used (LRU tabel) disegarkan paling sering sekali per interval
+
+    # Store matriks ternormalisasi: jumlah id alternatif per blok tersimpan
+    STORE_BLOCK_SIZE = 1024
+
+    # Indeks "sepatu serupa": baris per blok pencarian tervektorisasi
+    SIMILAR_BLOCK_SIZE = 65536
+    SIMILAR_MAX_K = 50
+
+    # Paginasi grid hasil & data
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 500
+
+    # Analisis sensitivitas Monte Carlo
+    SENSITIVITY_MAX_SAMPLES = 100_000
+    SENSITIVITY_WORKERS = 0  # >1 = pakai process pool untuk run besar
+
+    # Pekerjaan latar belakang (thread pool per proses)
+    JOB_WORKERS = 2
+    JOB_HEARTBEAT_SECONDS = 15  # interval penyegaran heartbeat job milik proses
+    JOB_STALE_SECONDS = 120  # job queued/running tanpa heartbeat selama ini -> failed (interrupted)
+
+    # Import / export katalog
+    CATALOG_CHUNK_SIZE = 1000
+    CATALOG_MAX_REPORTED_ERRORS = 20
+
+
+    # Profiling per-request (Server-Timing, /metrics, dump cProfile request terlambat)
+    PROFILING_ENABLED = os.environ.get("SPK_PROFILING") == "1"
+    PROFILE_SLOWEST_N = 0  # >0 = simpan dump cProfile N request paling lambat
+    PROFILE_SAMPLE_RATE = 0.1  # fraksi request yang diprofil dengan cProfile
+    PROFILE_DIR = os.path.join(BASE_DIR, "instance", "profiles")
+
+    # Tuning SQLite (lihat app/engine.py); dijalankan di setiap koneksi baru
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "foreign_keys": "ON",
+        "busy_timeout": 15000,  # ms, tunggu lock penulis lain
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,  # negatif = KiB (~64 MB)
+        "temp_store": "MEMORY",
+    }
+    # Saat boot: "version" = create_all/migrasi hanya bila PRAGMA user_version
+    # tertinggal dari migrations.SCHEMA_VERSION; "always" = selalu diperiksa
+    SCHEMA_CHECK = "version"
+
+    # Pool koneksi untuk database file SQLite (diabaikan untuk :memory:)
+    SQLITE_POOL_OPTIONS = {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": 3600,
+    }